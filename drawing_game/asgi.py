@@ -1,4 +1,5 @@
 import os
+import time
 from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
@@ -6,6 +7,7 @@ from django.core.asgi import get_asgi_application
 from django.urls import path
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "drawing_game.settings")
+started = time.perf_counter()
 
 # Initialize Django ASGI application early to ensure the AppRegistry is populated before importing code that may import ORM models.
 django_asgi_app = get_asgi_application()
@@ -25,3 +27,6 @@ application = ProtocolTypeRouter({
         )
     ),
 })
+
+# The RL agent is built lazily by game.agents, so this only covers Django and routing
+print(f"ASGI application loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
@@ -94,6 +94,37 @@ CHANNEL_LAYERS = {
 }
 
 ALLOWED_HOSTS = ['*']
+
+# Process pool that decodes drawings and runs agent updates off the event loop
+RL_WORKER_PROCESSES = 1  # 0 runs the jobs in a thread instead
+RL_WORKER_QUEUE_DEPTH = 32  # Jobs submitted beyond this many in flight are dropped
+RL_STATS_INTERVAL = 60  # Seconds between logs of queue waits and other stage counters
+
+# Q-table storage for QLearningAgent: 'dict', 'dense' (preallocated NumPy array)
+# or 'shared' (dense, in shared memory used by every worker process on the host)
+RL_Q_BACKEND = 'shared'
+RL_SHARED_TABLE_NAME = 'drawing_game'  # Prefix of the shared memory segments
+
+# Transitions are queued in a ring buffer and applied by a background learner
+RL_REPLAY_CAPACITY = 10000
+RL_LEARNER_BATCH_SIZE = 64
+RL_LEARNER_INTERVAL = 0.5  # Seconds between learner passes
+RL_ENV_POOL_SIZE = 64  # Most environments leased to rooms at once per process
+
+# Words and step hints, memory-mapped from a file built by `manage.py build_vocabulary`
+RL_VOCABULARY_SOURCE = BASE_DIR / 'game' / 'data' / 'vocabulary.json'
+RL_VOCABULARY_PATH = BASE_DIR / 'game' / 'data' / 'vocabulary.bin'
+
+# Snapshots of what the agent learned, mapped back in on startup
+RL_CHECKPOINT_PATH = BASE_DIR / 'checkpoints' / 'q_learning.ckpt'
+RL_CHECKPOINT_INTERVAL = 300  # Seconds between snapshots
+
+# Turn rotation, run for every room in a process by one scheduler task
+GAME_TURN_SECONDS = 60
+
+# Guesses and turns are buffered in memory and written with bulk_create
+GAME_EVENT_BATCH_SIZE = 200  # Buffered events that trigger an early flush
+GAME_EVENT_FLUSH_INTERVAL = 2.0  # Seconds between flushes
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
@@ -0,0 +1,152 @@
+"""Process-wide registry of the RL agent and the objects built around it.
+
+Nothing here is built at import time. Each component is constructed the
+first time a WebSocket room asks for it, so processes that only serve HTTP
+never import gym or allocate Q-tables.
+"""
+import os
+import time
+
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+_components = {}
+# Name -> (seconds it took to build, growth of peak RSS in KB or None)
+build_report = {}
+
+
+def _peak_rss():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _make_env():
+    import gym
+    return gym.make('CartPole-v1')
+
+
+def _build_vocabulary():
+    from .vocabulary import Vocabulary, build_vocabulary_from_json
+    path = settings.RL_VOCABULARY_PATH
+    if os.path.exists(path):
+        vocabulary = Vocabulary.load(path)
+        if not vocabulary.source_changed():
+            return vocabulary
+        # The JSON was edited since; rebuilding also gives shared word tables a new fingerprint
+        source = vocabulary.source or settings.RL_VOCABULARY_SOURCE
+    else:
+        # First run; `manage.py build_vocabulary` rebuilds it from another source
+        source = settings.RL_VOCABULARY_SOURCE
+    build_vocabulary_from_json(source, path)
+    return Vocabulary.load(path)
+
+
+def _build_agent():
+    from .q_learning_agent import QLearningAgent
+    from .checkpoints import load_checkpoint, restore_agent
+    agent = QLearningAgent(
+        _make_env(),
+        q_backend=getattr(settings, 'RL_Q_BACKEND', 'dict'),
+        shared_name=getattr(settings, 'RL_SHARED_TABLE_NAME', 'drawing_game'),
+        words=get_vocabulary(),
+    )
+    # Warm start from the last snapshot; the file is mapped, not parsed
+    snapshot = load_checkpoint(checkpoint_path())
+    if snapshot is not None:
+        restore_agent(agent, snapshot)
+    return agent
+
+
+def _build_learner():
+    from .replay import ReplayBuffer, BatchLearner
+    agent = get_agent()
+    # Transitions are queued here and applied to the agent in mini-batches
+    return BatchLearner(
+        agent,
+        ReplayBuffer(getattr(settings, 'RL_REPLAY_CAPACITY', 10000), len(agent.state_bins)),
+        batch_size=getattr(settings, 'RL_LEARNER_BATCH_SIZE', 64),
+        interval=getattr(settings, 'RL_LEARNER_INTERVAL', 0.5),
+    )
+
+
+def _build_checkpointer():
+    from .checkpoints import Checkpointer
+    return Checkpointer(get_agent(), checkpoint_path(), interval=getattr(settings, 'RL_CHECKPOINT_INTERVAL', 300))
+
+
+def _build_env_pool():
+    from .env_pool import EnvPool
+    # One environment per active room, so rooms don't reset each other's episodes
+    return EnvPool(_make_env, max_size=getattr(settings, 'RL_ENV_POOL_SIZE', 64))
+
+
+_builders = {
+    'vocabulary': _build_vocabulary,
+    'agent': _build_agent,
+    'learner': _build_learner,
+    'checkpointer': _build_checkpointer,
+    'env_pool': _build_env_pool,
+}
+# Components a builder fetches itself; they are built before its clock starts,
+# so each entry in build_report only covers its own builder
+_dependencies = {
+    'agent': ('vocabulary',),
+    'learner': ('agent',),
+    'checkpointer': ('agent',),
+}
+
+
+def checkpoint_path():
+    return getattr(settings, 'RL_CHECKPOINT_PATH', settings.BASE_DIR / 'checkpoints' / 'q_learning.ckpt')
+
+
+def get(name):
+    component = _components.get(name)
+    if component is None:
+        for dependency in _dependencies.get(name, ()):
+            get(dependency)
+        started, rss_before = time.perf_counter(), _peak_rss()
+        component = _components[name] = _builders[name]()
+        rss_after = _peak_rss()
+        build_report[name] = (time.perf_counter() - started, None if rss_before is None else rss_after - rss_before)
+        print(f"Built {name} on first use: {format_report(name)}")
+    return component
+
+
+def get_vocabulary():
+    return get('vocabulary')
+
+
+def get_agent():
+    return get('agent')
+
+
+def get_learner():
+    return get('learner')
+
+
+def get_checkpointer():
+    return get('checkpointer')
+
+
+def get_env_pool():
+    return get('env_pool')
+
+
+def format_report(name):
+    seconds, rss_kb = build_report[name]
+    text = f"{seconds * 1000:.1f} ms"
+    if rss_kb is not None:
+        text += f", peak RSS +{rss_kb / 1024:.1f} MB"
+    return text
+
+
+def startup_report():
+    if not build_report:
+        return "No RL components built in this process"
+    return "; ".join(f"{name}: {format_report(name)}" for name in build_report)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import struct
+
+import numpy as np
+
+from .q_tables import DenseQTable
+
+MAGIC = b'DGCKPT01'
+ALIGN = 64
+
+
+def save_checkpoint(path, arrays):
+    """Write named arrays to one file: magic, header length, JSON header, raw arrays.
+
+    Every array starts on a 64-byte boundary so load_checkpoint can map it
+    in place. The file is written under a temporary name and renamed, so
+    readers only ever see a complete snapshot.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    header = {}
+    offset = 0
+    for name, array in arrays.items():
+        header[name] = {'dtype': array.dtype.str, 'shape': array.shape, 'offset': offset}
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header_bytes = json.dumps(header).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, mode='c'):
+    """Map the arrays of a snapshot without reading them; None if there is none.
+
+    The default copy-on-write mode lets the arrays be updated in memory
+    without touching the file.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                print(f"Ignoring {path}: not a checkpoint file")
+                return None
+            header_length, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length))
+    except FileNotFoundError:
+        return None
+    data_start = -(-(len(MAGIC) + 8 + header_length) // ALIGN) * ALIGN
+    arrays = {}
+    for name, info in header.items():
+        shape = tuple(info['shape'])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=info['dtype'])
+        else:
+            arrays[name] = np.memmap(path, dtype=info['dtype'], mode=mode,
+                                     offset=data_start + info['offset'], shape=shape)
+    return arrays
+
+
+def agent_arrays(agent):
+    """Copy what a QLearningAgent or MonteCarloAgent has learned into arrays."""
+    n_states, n_actions = agent.discretizer.n_states, len(agent.actions)
+    if isinstance(agent.q_table, DenseQTable):
+        q_table = agent.q_table.values.copy()
+    else:
+        q_table = np.zeros((n_states, n_actions))
+        for state, row in agent.q_table.items():
+            index = int((np.asarray(state) + 1) @ agent.discretizer.strides)
+            for action, value in row.items():
+                q_table[index, action] = value
+    words = list(agent.word_q_table)
+    arrays = {
+        'q_table': q_table,
+        'words': np.array(words, dtype=str),
+        'word_values': np.array([agent.word_q_table[word] for word in words], dtype=np.float64),
+    }
+    if hasattr(agent, 'word_returns_sum'):
+        arrays['word_returns_sum'] = np.array([agent.word_returns_sum.get(word, 0) for word in words], dtype=np.float64)
+        arrays['word_returns_count'] = np.array([agent.word_returns_count.get(word, 0) for word in words], dtype=np.int64)
+    return arrays
+
+
+def restore_agent(agent, arrays):
+    """Warm start an agent from a snapshot returned by load_checkpoint.
+
+    A private dense table adopts the mapped array as is, so pages are only
+    read when first touched. A shared table is only filled while it is
+    still all zeros, i.e. when no other worker has started learning in it.
+    """
+    q_table = arrays.get('q_table')
+    shape = (agent.discretizer.n_states, len(agent.actions))
+    if q_table is not None and q_table.shape == shape:
+        if isinstance(agent.q_table, DenseQTable):
+            if getattr(agent, 'q_backend', 'dense') == 'shared':
+                if not agent.q_table.values.any():
+                    agent.q_table.values[:] = q_table
+            else:
+                agent.q_table.values = q_table
+        else:
+            for index in np.flatnonzero(q_table.any(axis=1)):
+                state = tuple(int(i) - 1 for i in np.unravel_index(index, agent.discretizer.dims))
+                agent.q_table[state] = dict(zip(agent.actions, q_table[index].tolist()))
+    elif q_table is not None:
+        print(f"Ignoring snapshot Q-table of shape {q_table.shape}, expected {shape}")
+
+    words = [str(word) for word in arrays.get('words', [])]
+    for i, word in enumerate(words):
+        if word in agent.word_q_table:
+            continue  # Already learned live
+        agent.word_q_table[word] = float(arrays['word_values'][i])
+        if hasattr(agent, 'word_returns_sum') and 'word_returns_sum' in arrays:
+            agent.word_returns_sum[word] = float(arrays['word_returns_sum'][i])
+            agent.word_returns_count[word] = int(arrays['word_returns_count'][i])
+
+
+class Checkpointer:
+    """Periodically snapshots an agent from a background task.
+
+    The arrays are copied on the event loop, which only takes a memcpy, and
+    the file is written from a thread so the loop never waits on disk.
+    """
+
+    def __init__(self, agent, path, interval=300):
+        self.agent = agent
+        self.path = path
+        self.interval = interval  # Seconds between snapshots
+        self.task = None
+
+    def start(self):
+        # Must be called from the event loop; starting twice is a no-op
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await loop.run_in_executor(None, save_checkpoint, self.path, agent_arrays(self.agent))
+            except Exception as e:
+                print(f"Checkpoint failed: {e}")
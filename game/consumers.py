@@ -1,24 +1,30 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from asgiref.sync import sync_to_async
-import asyncio
 import uuid
-from .models import Room, User
-from .q_learning_agent import QLearningAgent
-import gym
-from .rl_model import choose_word, suggest_steps, provide_suggestions, check_guess, update_model, get_state, adjust_word_difficulty
+from .env_pool import EnvPoolExhausted
+from .models import GameEvent
+from .rl_model import provide_suggestions, check_guess, get_state, adjust_word_difficulty
+from . import agents, event_log, game_loop, room_state, stats, strokes, workers
 
 class GameConsumer(AsyncWebsocketConsumer):
-    env = gym.make('CartPole-v1')
-    agent = QLearningAgent(env)  # Initialize the Q-learning agent with the environment
-
     async def connect(self):
         self.room_name = self.scope['url_route']['kwargs']['room_name']
         self.room_group_name = f'game_{self.room_name}'
         self.user_id = str(uuid.uuid4())
         self.user_name = None
         self.current_word = None  # Add a variable to store the current word
-        self.env.reset()  # Reset the environment upon connection
+        # The agent and its environments are built when the first room needs them
+        agents.get_learner().start()  # Background task applying queued transitions
+        agents.get_checkpointer().start()  # Background task snapshotting the agent
+        room_state.get_cache().start()  # Hears about words set by other processes
+        event_log.get_writer().connected()  # Background task writing buffered game events
+        stats.get_reporter().start()  # Logs queue waits and other stage counters
+        strokes.connected(self.room_name)
+        try:
+            self.env = agents.get_env_pool().acquire(self.room_name)
+        except EnvPoolExhausted as e:
+            self.env = None  # The room still plays, its drawings just aren't learned from
+            print(f"No environment for room {self.room_name}: {e}")
 
         # Join room group
         await self.channel_layer.group_add(
@@ -30,6 +36,11 @@ class GameConsumer(AsyncWebsocketConsumer):
         await self.accept()
 
     async def disconnect(self, close_code):
+        if self.env is not None:
+            agents.get_env_pool().release(self.room_name)
+            self.env = None
+        strokes.disconnected(self.room_name)
+
         # Remove user from room
         if self.user_id:
             await self.remove_user_from_room()
@@ -39,6 +50,7 @@ class GameConsumer(AsyncWebsocketConsumer):
             self.room_group_name,
             self.channel_name
         )
+        await event_log.get_writer().disconnected()
 
     async def receive(self, text_data):
         data = json.loads(text_data)
@@ -48,51 +60,99 @@ class GameConsumer(AsyncWebsocketConsumer):
             self.user_name = data['username']
             self.user_id = data['userId']
             await self.add_user_to_room(self.user_name, self.user_id)
+            # Replay the strokes of the current turn to the late joiner
+            await self.send(text_data=json.dumps({
+                'action': 'stroke_history',
+                'strokes': strokes.get_strokes(self.room_name)
+            }))
         elif action == 'start_game':
-            self.env.reset()  # Reset the environment when the game starts
             await self.start_game()
-        elif action == 'drawing':
-            drawing = data['drawing']
-            await self.channel_layer.group_send(
-                self.room_group_name,
+        elif action == 'drawing' and data.get('mode') == 'stroke':
+            # Only the points drawn since the previous send
+            stroke = strokes.add_stroke(self.room_name, data['seq'], data['points'])
+            if stroke is None:
+                return
+            await game_loop.group_event(
+                self.room_name,
+                'draw_stroke',
+                'draw_stroke',
                 {
-                    'type': 'draw',
-                    'drawing': drawing,
+                    'seq': stroke['seq'],
+                    'points': stroke['points'],
                     'drawer': data['drawer'],
-                    'suggestion': provide_suggestions(drawing)
-                }
+                    'suggestion': provide_suggestions(stroke)
+                },
+                seq=stroke['seq']
+            )
+            # Decoding runs in the worker stage, the update in the learner
+            workers.get_stage().submit(workers.decode_drawing, strokes.get_raster(self.room_name), callback=self.record_transition)
+        elif action == 'drawing':
+            drawing = data['drawing']
+            await self.broadcast(
+                'draw',
+                drawing=drawing,
+                drawer=data['drawer'],
+                suggestion=provide_suggestions(drawing)
             )
-            state = get_state(drawing)
-            action = self.agent.choose_action(state)
-            next_state, reward, terminated, truncated, _ = self.env.step(action)
-            next_state = get_state(next_state)
-            self.agent.update_q_table(state, action, reward, next_state)
+            workers.get_stage().submit(workers.decode_drawing, drawing, callback=self.record_transition)
         elif action == 'guess':
-            correct = await sync_to_async(check_guess)(self.room_name, data['guess'])
+            # Served from memory unless another process changed the word
+            word = await room_state.get_cache().current_word(self.room_name)
+            correct = check_guess(word, data['guess'])
             if correct:
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
-                        'type': 'correct_guess',
-                        'username': data['username'],
-                        'guess': data['guess']
-                    }
+                await self.broadcast(
+                    'correct_guess',
+                    username=data['username'],
+                    guess=data['guess']
                 )
                 # Adjust difficulty if the guess is correct
-                if self.current_word:
-                    adjust_word_difficulty(self.current_word, correct_guess=True)
+                if word:
+                    adjust_word_difficulty(word, correct_guess=True)
             else:
-                if self.current_word:
-                    adjust_word_difficulty(self.current_word, correct_guess=False)
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'chat_message',
-                    'username': data['username'],
-                    'message': data['guess']
-                }
+                if word:
+                    adjust_word_difficulty(word, correct_guess=False)
+            await self.broadcast(
+                'chat_message',
+                username=data['username'],
+                message=data['guess']
+            )
+            # Buffered; written in batches instead of one query per chat message
+            event_log.get_writer().record(
+                self.room_name,
+                GameEvent.CORRECT_GUESS if correct else GameEvent.GUESS,
+                self.user_id,
+                username=data['username'],
+                guess=data['guess'],
+                word=word
             )
-            await sync_to_async(update_model)(self.room_name, data)
+
+    def record_transition(self, state):
+        if self.env is None:
+            return
+        action = agents.get_agent().choose_action(state)
+        next_state, reward, terminated, truncated, _ = self.env.step(action)
+        if terminated or truncated:
+            self.env.reset()
+        agents.get_learner().push(state, action, reward, get_state(next_state))
+
+    async def broadcast(self, action, **fields):
+        await game_loop.broadcast(self.room_name, action, **fields)
+
+    async def send_frame(self, event):
+        await self.send(text_data=event['text'])
+
+    async def draw_stroke(self, event):
+        # Keeps this process's log complete for late joiners. The points only travel
+        # in the frame, which is parsed by the first connection here to see the stroke.
+        if strokes.is_new(self.room_name, event['seq']):
+            frame = json.loads(event['text'])
+            strokes.add_stroke(self.room_name, frame['seq'], frame['points'])
+        await self.send_frame(event)
+
+    async def clear_canvas(self, event):
+        # Every process resets its own stroke log, once per turn
+        strokes.start_turn(self.room_name, event['turn'])
+        await self.send_frame(event)
 
     async def new_word(self, event):
         self.current_word = event['word']  # Store the current word
@@ -103,140 +163,10 @@ class GameConsumer(AsyncWebsocketConsumer):
             'drawer': event['drawer']  # Include drawer information
         }))
 
-    async def draw(self, event):
-        await self.send(text_data=json.dumps({
-            'action': 'draw',
-            'drawing': event['drawing'],
-            'drawer': event['drawer'],
-            'suggestion': event['suggestion'],
-        }))
-
-    async def chat_message(self, event):
-        await self.send(text_data=json.dumps({
-            'action': 'chat_message',
-            'username': event['username'],
-            'message': event['message'],
-        }))
-
-    async def correct_guess(self, event):
-        await self.send(text_data=json.dumps({
-            'action': 'correct_guess',
-            'username': event['username'],
-            'guess': event['guess']
-        }))
-
-    async def start_turn(self, drawer):
-        word = choose_word(self.room_name)
-        steps = suggest_steps(word)
-
-        # Update the current word for the room
-        await sync_to_async(Room.objects.filter(name=self.room_name).update)(current_word=word)
-        self.current_word = word  # Store the current word
-        print(f"Drawer: {drawer}, Word: {word}")
-        # Notify the drawer
-        await self.channel_layer.send(
-            drawer,
-            {
-                'type': 'new_word',
-                'word': word,
-                'steps': steps,
-                'drawer': drawer  # Include drawer information
-            }
-        )
-
-        # Notify others
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'turn',
-                'drawer': drawer,
-                'word': word,
-                'steps': steps
-            }
-        )
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'clear_canvas'
-            }
-        )
-        await asyncio.sleep(60)
-        await self.next_turn()
-
-    async def turn(self, event):
-        await self.send(text_data=json.dumps({
-            'action': 'turn',
-            'drawer': event['drawer'],
-            'word': event['word'],
-            'steps': event['steps']
-        }))
-
-    async def clear_canvas(self, event):
-        await self.send(text_data=json.dumps({
-            'action': 'clear_canvas'
-        }))
-
-    async def next_turn(self):
-        room = await sync_to_async(Room.objects.get)(name=self.room_name)
-        room.current_drawer = (room.current_drawer + 1) % room.users
-        await sync_to_async(room.save)()
-        drawer = room.current_drawer
-        drawer_user = await self.get_user_by_turn(drawer)
-        await self.start_turn(drawer_user)
-
-    @sync_to_async
-    def add_user_to_room(self, username, user_id):
-        room, created = Room.objects.get_or_create(name=self.room_name)
-        User.objects.create(username=username, user_id=user_id, room=room)
-        room.users += 1
-        room.save()
-
-    @sync_to_async
-    def remove_user_from_room(self):
-        room = Room.objects.get(name=self.room_name)
-        users = User.objects.filter(user_id=self.user_id, room=room)
-        for user in users:
-            user.delete()
-        room.users = max(0, room.users - len(users))
-        room.save()
-
-    @sync_to_async
-    def update_user_count(self, increment=True):
-        room, created = Room.objects.get_or_create(name=self.room_name)
-        if increment:
-            room.users += 1
-        else:
-            room.users -= 1
-        room.save()
-
-    @sync_to_async
-    def get_user_count(self):
-        room, created = Room.objects.get_or_create(name=self.room_name)
-        return room.users
-
-    @sync_to_async
-    def get_user_by_turn(self, turn):
-        room = Room.objects.get(name=self.room_name)
-        users = list(room.user_set.all())
-        if users:
-            return users[turn % len(users)].user_id
-        return None
-
-    async def broadcast_user_count(self):
-        user_count = await self.get_user_count()
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'user_count',
-                'user_count': user_count
-            }
-        )
-
-    async def user_count(self, event):
-        await self.send(text_data=json.dumps({
-            'action': 'user_count',
-            'user_count': event['user_count'],
-        }))
+    async def broadcast_user_count(self, user_count=None):
+        if user_count is None:
+            user_count = await room_state.user_count(self.room_name)
+        await self.broadcast('user_count', user_count=user_count)
 
     async def send_user_count(self, user_count):
         await self.send(text_data=json.dumps({
@@ -245,36 +175,28 @@ class GameConsumer(AsyncWebsocketConsumer):
         }))
 
     async def start_game(self):
-        self.env.reset()  # Reset the environment when the game starts
-        room = await sync_to_async(Room.objects.get)(name=self.room_name)
-        room.current_drawer = 0
-        await sync_to_async(room.save)()
-        drawer_user = await self.get_user_by_turn(room.current_drawer)
-        await self.start_turn(drawer_user)
+        # The process-wide scheduler rotates turns from here on, whether or not
+        # this connection stays open; a game that is already running is left alone
+        if not game_loop.get_scheduler().start_room(self.room_name):
+            return
+        agents.get_env_pool().reset(self.room_name)  # Start a fresh episode for this room only
+        await room_state.reset_turn(self.room_name)
+        drawer_user = await game_loop.get_user_by_turn(self.room_name, 0)
+        await game_loop.start_turn(self.room_name, drawer_user)
 
     async def add_user_to_room(self, username, user_id):
-        await self._add_user_to_room(username, user_id)
-        await self.broadcast_user_count()
+        user_count = await room_state.join_room(self.room_name, username, user_id)
+        await room_state.get_cache().joined(self.room_name, user_id)
+        await self.broadcast_user_count(user_count)
 
     async def remove_user_from_room(self):
-        await self._remove_user_from_room()
-        await self.broadcast_user_count()
-
-    @sync_to_async
-    def _add_user_to_room(self, username, user_id):
-        room, created = Room.objects.get_or_create(name=self.room_name)
-        User.objects.create(username=username, user_id=user_id, room=room)
-        room.users += 1
-        room.save()
-
-    @sync_to_async
-    def _remove_user_from_room(self):
-        room = Room.objects.get(name=self.room_name)
-        users = User.objects.filter(user_id=self.user_id, room=room)
-        for user in users:
-            user.delete()
-        room.users = max(0, room.users - len(users))
-        room.save()
+        user_count = await room_state.leave_room(self.room_name, self.user_id)
+        if user_count == 0:
+            await room_state.get_cache().closed(self.room_name)
+        elif user_count is not None:
+            await room_state.get_cache().left(self.room_name, self.user_id)
+        if user_count is not None:
+            await self.broadcast_user_count(user_count)
 
     def calculate_reward(self, drawing, guess):
         # Define your reward function based on the drawing and guessing accuracy
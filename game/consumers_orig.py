@@ -61,7 +61,8 @@ class GameConsumer(AsyncWebsocketConsumer):
                 }
             )
         elif action == 'guess':
-            correct = check_guess(self.room_name, data['guess'])
+            room = await sync_to_async(Room.objects.get)(name=self.room_name)
+            correct = check_guess(room.current_word, data['guess'])
             if correct:
                 await self.channel_layer.group_send(
                     self.room_group_name,
@@ -68,7 +68,8 @@ class GameConsumer(AsyncWebsocketConsumer):
             next_state = get_state(next_state)
             self.agent.update_q_table(state, action, reward, next_state)
         elif action == 'guess':
-            correct = await sync_to_async(check_guess)(self.room_name, data['guess'])
+            room = await sync_to_async(Room.objects.get)(name=self.room_name)
+            correct = check_guess(room.current_word, data['guess'])
             if correct:
                 await self.channel_layer.group_send(
                     self.room_group_name,
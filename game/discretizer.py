@@ -0,0 +1,29 @@
+import numpy as np
+
+
+class StateDiscretizer:
+    """Vectorized binning of continuous states against per-dimension bin edges.
+
+    Works on a single state of shape (d,) or a batch of shape (N, d). Bin
+    indices follow np.digitize, so dimension i has len(state_bins[i]) + 1
+    possible values, and flat indices are computed with precomputed C-order
+    strides over those sizes.
+    """
+
+    def __init__(self, state_bins):
+        width = max(len(bins) for bins in state_bins)
+        # Pad with +inf so every dimension can be compared in one operation
+        self.edges = np.full((len(state_bins), width), np.inf)
+        for i, bins in enumerate(state_bins):
+            self.edges[i, :len(bins)] = bins
+        self.dims = tuple(len(bins) + 1 for bins in state_bins)
+        self.strides = np.cumprod((self.dims[1:] + (1,))[::-1])[::-1].astype(np.int64)
+        self.n_states = int(np.prod(self.dims))
+
+    def bin_indices(self, states):
+        states = np.asarray(states, dtype=np.float64)
+        return (states[..., :, None] >= self.edges).sum(axis=-1)
+
+    def flat_index(self, states):
+        index = self.bin_indices(states) @ self.strides
+        return int(index) if index.ndim == 0 else index
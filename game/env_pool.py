@@ -0,0 +1,47 @@
+class EnvPoolExhausted(Exception):
+    pass
+
+
+class EnvPool:
+    """Leases one environment per active room and recycles it when the room empties.
+
+    Every connection to a room acquires the room's lease and releases it on
+    disconnect; the environment goes back to the idle list once the last
+    connection is gone. At most max_size environments are ever created.
+    """
+
+    def __init__(self, make_env, max_size=64):
+        self.make_env = make_env
+        self.max_size = max_size
+        self.leases = {}  # Room name -> environment
+        self.holders = {}  # Room name -> connections holding the lease
+        self.idle = []
+
+    def acquire(self, room_name):
+        env = self.leases.get(room_name)
+        if env is None:
+            if self.idle:
+                env = self.idle.pop()
+            elif len(self.leases) < self.max_size:
+                env = self.make_env()
+            else:
+                raise EnvPoolExhausted(f"All {self.max_size} environments are leased")
+            env.reset()
+            self.leases[room_name] = env
+        self.holders[room_name] = self.holders.get(room_name, 0) + 1
+        return env
+
+    def release(self, room_name):
+        holders = self.holders.get(room_name, 0) - 1
+        if holders > 0:
+            self.holders[room_name] = holders
+            return
+        self.holders.pop(room_name, None)
+        env = self.leases.pop(room_name, None)
+        if env is not None:
+            self.idle.append(env)
+
+    def reset(self, room_name):
+        env = self.leases.get(room_name)
+        if env is not None:
+            env.reset()
@@ -1,8 +1,20 @@
+import argparse
+import os
+import sys
+
 import gymnasium as gym
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+if __package__:
+    from .result_cache import ResultCache
+    from .vector_cartpole import VectorCartPole
+else:  # Run as a script rather than as game.evaluation
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from game.result_cache import ResultCache
+    from game.vector_cartpole import VectorCartPole
+
 # Initialize the CartPole-v1 environment
 env = gym.make('CartPole-v1')
 
@@ -18,20 +30,17 @@ def discretize_state(state, bins):
     """Discretize the continuous state space into discrete bins."""
     return tuple(np.digitize(s, b) for s, b in zip(state, bins))
 
+def discretize_states(states, bins):
+    """Discretize a (num_envs, 4) batch of states into a (num_envs, 4) array of bin indices."""
+    return np.stack([np.digitize(states[:, i], b) for i, b in enumerate(bins)], axis=1)
+
 def initialize_q(num_bins, action_space_n):
-    """Initialize the Q-table with zeros."""
-    Q = {}
-    for indices in np.ndindex(*(num_bins + 1,) * 4):
-        Q[indices] = np.zeros(action_space_n)
-    return Q
+    """Initialize the Q-table with zeros, indexed by a discretized state tuple then the action."""
+    return np.zeros((num_bins + 1,) * 4 + (action_space_n,))
 
 def initialize_returns(num_bins, action_space_n):
-    """Initialize the returns dictionary."""
-    returns = {}
-    for indices in np.ndindex(*(num_bins + 1,) * 4):
-        for action in range(action_space_n):
-            returns[(indices, action)] = []
-    return returns
+    """Initialize the return counts; Q holds the running mean of the returns themselves."""
+    return np.zeros((num_bins + 1,) * 4 + (action_space_n,), dtype=np.int64)
 
 def epsilon_greedy(Q, state, epsilon, nA):
     """Epsilon-greedy policy for action selection."""
@@ -40,6 +49,18 @@ def epsilon_greedy(Q, state, epsilon, nA):
     else:
         return np.argmax(Q[state])
 
+def epsilon_greedy_batch(Q, states, epsilon, nA):
+    """Epsilon-greedy actions for a (num_envs, 4) array of discretized states."""
+    actions = Q[tuple(states.T)].argmax(axis=1)
+    explore = np.random.rand(len(states)) < epsilon
+    actions[explore] = np.random.choice(nA, size=int(explore.sum()))
+    return actions
+
+def print_progress(label, done, finished, num_episodes):
+    """Print the episode counter for every hundredth episode among those just finished."""
+    for i in range(-(-done // 100) * 100, min(done + finished, num_episodes), 100):
+        print(f"{label} Episode: {i}")
+
 def monte_carlo(env, num_episodes, gamma, epsilon, num_bins):
     """Monte Carlo algorithm for learning Q-values."""
     bins = create_bins(num_bins, env)
@@ -62,16 +83,21 @@ def monte_carlo(env, num_episodes, gamma, epsilon, num_bins):
             state = next_state
             total_reward += reward
         rewards_per_episode.append(total_reward)
-        G = 0
-        visited = set()
-        for state, action, reward in reversed(episode):
-            G = gamma * G + reward
-            if (state, action) not in visited:
-                visited.add((state, action))
-                returns[(state, action)].append(G)
-                Q[state][action] = np.mean(returns[(state, action)])
+        update_from_episode(Q, returns, episode, gamma)
     return Q, rewards_per_episode
 
+def update_from_episode(Q, returns, episode, gamma):
+    """First-visit Monte Carlo update from one finished episode."""
+    G = 0
+    visited = set()
+    for state, action, reward in reversed(episode):
+        G = gamma * G + reward
+        if (state, action) not in visited:
+            visited.add((state, action))
+            # Incremental mean: O(1) per visit, no matter how many returns came before
+            returns[state + (action,)] += 1
+            Q[state][action] += (G - Q[state][action]) / returns[state + (action,)]
+
 def q_learning(env, num_episodes, alpha, gamma, epsilon, num_bins):
     """Q-learning algorithm for learning Q-values."""
     bins = create_bins(num_bins, env)
@@ -94,6 +120,68 @@ def q_learning(env, num_episodes, alpha, gamma, epsilon, num_bins):
         rewards_per_episode.append(total_reward)
     return Q, rewards_per_episode
 
+def monte_carlo_vectorized(vec_env, num_episodes, gamma, epsilon, num_bins):
+    """Monte Carlo over a VectorCartPole, with one episode in flight per environment."""
+    bins = create_bins(num_bins, vec_env)
+    nA = vec_env.action_space.n
+    Q = initialize_q(num_bins + 1, nA)
+    returns = initialize_returns(num_bins + 1, nA)
+    rewards_per_episode = []
+    # Episodes in flight are recorded in arrays; only a finished one is turned into a list
+    envs, horizon = np.arange(vec_env.num_envs), vec_env.max_episode_steps
+    episode_states = np.zeros((vec_env.num_envs, horizon, 4), dtype=np.int64)
+    episode_actions = np.zeros((vec_env.num_envs, horizon), dtype=np.int64)
+    episode_rewards = np.zeros((vec_env.num_envs, horizon))
+    lengths = np.zeros(vec_env.num_envs, dtype=np.int64)
+    states = discretize_states(vec_env.reset(), bins)
+    while len(rewards_per_episode) < num_episodes:
+        actions = epsilon_greedy_batch(Q, states, epsilon, nA)
+        next_states, rewards, terminated, truncated, _ = vec_env.step(actions)
+        episode_states[envs, lengths] = states
+        episode_actions[envs, lengths] = actions
+        episode_rewards[envs, lengths] = rewards
+        lengths += 1
+        finished = np.flatnonzero(terminated | truncated)
+        print_progress("Monte Carlo", len(rewards_per_episode), len(finished), num_episodes)
+        for i in finished:
+            n = lengths[i]
+            episode = list(zip(map(tuple, episode_states[i, :n].tolist()),
+                               episode_actions[i, :n].tolist(), episode_rewards[i, :n].tolist()))
+            rewards_per_episode.append(episode_rewards[i, :n].sum())
+            update_from_episode(Q, returns, episode, gamma)
+            lengths[i] = 0
+        states = discretize_states(next_states, bins)
+    return Q, rewards_per_episode[:num_episodes]
+
+def q_learning_vectorized(vec_env, num_episodes, alpha, gamma, epsilon, num_bins):
+    """Q-learning over a VectorCartPole, updating from every environment's transition each step."""
+    bins = create_bins(num_bins, vec_env)
+    nA = vec_env.action_space.n
+    Q = initialize_q(num_bins + 1, nA)
+    rewards_per_episode = []
+    total_rewards = np.zeros(vec_env.num_envs)
+    states = discretize_states(vec_env.reset(), bins)
+    while len(rewards_per_episode) < num_episodes:
+        actions = epsilon_greedy_batch(Q, states, epsilon, nA)
+        next_states, rewards, terminated, truncated, info = vec_env.step(actions)
+        # Bootstrap from where the episode ended, not from the auto-reset state
+        final_states = discretize_states(info['final_observation'], bins)
+        targets = rewards + gamma * Q[tuple(final_states.T)].max(axis=1)
+        # Environments that hit the same state-action pair are folded into one update:
+        # c sequential updates towards the same target move Q by 1 - (1 - alpha)^c of the gap
+        flat = np.ravel_multi_index(tuple(states.T) + (actions,), Q.shape)
+        pairs, which, counts = np.unique(flat, return_inverse=True, return_counts=True)
+        mean_targets = np.bincount(which, weights=targets) / counts
+        Q_flat = Q.reshape(-1)
+        Q_flat[pairs] += (1 - (1 - alpha) ** counts) * (mean_targets - Q_flat[pairs])
+        total_rewards += rewards
+        finished = terminated | truncated
+        print_progress("Q-learning", len(rewards_per_episode), int(finished.sum()), num_episodes)
+        rewards_per_episode.extend(total_rewards[finished])
+        total_rewards[finished] = 0
+        states = discretize_states(next_states, bins)
+    return Q, rewards_per_episode[:num_episodes]
+
 def evaluate_policy(env, Q, num_episodes, num_bins):
     """Evaluate the policy by running it for a number of episodes and calculating the average reward."""
     bins = create_bins(num_bins, env)
@@ -111,25 +199,92 @@ def evaluate_policy(env, Q, num_episodes, num_bins):
         total_rewards.append(total_reward)
     return np.mean(total_rewards), np.std(total_rewards)
 
-def main():
+def evaluate_policy_vectorized(vec_env, Q, num_episodes, num_bins):
+    """Evaluate the greedy policy with a batch of episodes rolled out together.
+
+    Returns the mean and std of the episode rewards, and the episode lengths.
+    """
+    if vec_env.autoreset:
+        raise ValueError("evaluate_policy_vectorized needs a VectorCartPole with autoreset=False")
+    bins = create_bins(num_bins, vec_env)
+    total_rewards, lengths = [], []
+    while len(total_rewards) < num_episodes:
+        states = discretize_states(vec_env.reset(), bins)
+        episode_rewards = np.zeros(vec_env.num_envs)
+        episode_lengths = np.zeros(vec_env.num_envs, dtype=np.int64)
+        active = np.ones(vec_env.num_envs, dtype=bool)
+        while active.any():
+            # One gather and argmax gives the greedy action of every episode
+            actions = Q[tuple(states.T)].argmax(axis=1)
+            next_states, rewards, terminated, truncated, _ = vec_env.step(actions)
+            episode_rewards += rewards * active
+            episode_lengths += active
+            active &= ~(terminated | truncated)
+            states = discretize_states(next_states, bins)
+        total_rewards.extend(episode_rewards)
+        lengths.extend(episode_lengths)
+    total_rewards = total_rewards[:num_episodes]
+    return np.mean(total_rewards), np.std(total_rewards), np.array(lengths[:num_episodes])
+
+def main(num_envs=0):
+    """Train and compare Q-learning and Monte Carlo on CartPole.
+
+    By default both learn from the single gymnasium env, one step at a time.
+    num_envs > 0 trains on that many VectorCartPoles stepped together
+    instead, which is much faster but not the same algorithm: every
+    environment acts on the same Q between updates, and Q-learning folds
+    repeated state-action pairs into one averaged update. Its scores are
+    not comparable with the sequential ones.
+    """
     num_episodes = 1000
     alpha = 0.1
     gamma = 0.99
     epsilon = 0.1
     num_bins = 10
+    seed = 0
+
+    if num_envs:
+        # Seeded runs are reproducible, so unchanged settings load the last result
+        cache = ResultCache()
+        params = {'num_episodes': num_episodes, 'gamma': gamma, 'epsilon': epsilon, 'num_bins': num_bins,
+                  'num_envs': num_envs, 'seed': seed}
+
+        def train(learner, *args):
+            np.random.seed(seed)
+            Q, rewards = learner(VectorCartPole(num_envs, seed=seed), num_episodes, *args)
+            return {'Q': Q, 'rewards': np.asarray(rewards, dtype=float)}
+
+        print("Starting Q-learning...")
+        result = cache.get_or_compute({'algorithm': 'q_learning', 'alpha': alpha, **params},
+                                      lambda: train(q_learning_vectorized, alpha, gamma, epsilon, num_bins))
+        Q_q_learning, rewards_q_learning = result['Q'], result['rewards']
+        print("Q-learning complete!")
+
+        print("Starting Monte Carlo...")
+        result = cache.get_or_compute({'algorithm': 'monte_carlo', **params},
+                                      lambda: train(monte_carlo_vectorized, gamma, epsilon, num_bins))
+        Q_monte_carlo, rewards_monte_carlo = result['Q'], result['rewards']
+        print("Monte Carlo complete!")
+    else:
+        print("Starting Q-learning...")
+        Q_q_learning, rewards_q_learning = q_learning(env, num_episodes, alpha, gamma, epsilon, num_bins)
+        print("Q-learning complete!")
 
-    print("Starting Q-learning...")
-    Q_q_learning, rewards_q_learning = q_learning(env, num_episodes, alpha, gamma, epsilon, num_bins)
-    print("Q-learning complete!")
+        print("Starting Monte Carlo...")
+        Q_monte_carlo, rewards_monte_carlo = monte_carlo(env, num_episodes, gamma, epsilon, num_bins)
+        print("Monte Carlo complete!")
 
-    print("Starting Monte Carlo...")
-    Q_monte_carlo, rewards_monte_carlo = monte_carlo(env, num_episodes, gamma, epsilon, num_bins)
-    print("Monte Carlo complete!")
+    def evaluate(Q):
+        if not num_envs:
+            return evaluate_policy(env, Q, 100, num_bins)
+        # All 100 episodes rolled out together
+        mean, std, _ = evaluate_policy_vectorized(VectorCartPole(100, seed=seed + 1, autoreset=False), Q, 100, num_bins)
+        return mean, std
 
     print("Evaluating Q-learning policy...")
-    avg_reward_q_learning, std_reward_q_learning = evaluate_policy(env, Q_q_learning, 100, num_bins)
+    avg_reward_q_learning, std_reward_q_learning = evaluate(Q_q_learning)
     print("Evaluating Monte Carlo policy...")
-    avg_reward_monte_carlo, std_reward_monte_carlo = evaluate_policy(env, Q_monte_carlo, 100, num_bins)
+    avg_reward_monte_carlo, std_reward_monte_carlo = evaluate(Q_monte_carlo)
 
     # Plotting the results
     methods = ['Q-learning', 'Monte Carlo']
@@ -163,4 +318,7 @@ def main():
     print(results)
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Compare Q-learning and Monte Carlo on CartPole")
+    parser.add_argument('--num-envs', type=int, default=0,
+                        help="Train on this many vectorized CartPoles; results differ from the sequential run")
+    main(parser.parse_args().num_envs)
@@ -0,0 +1,105 @@
+import asyncio
+import atexit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import GameEvent
+
+
+class EventWriter:
+    """Buffers GameEvents in memory and writes them with one bulk_create per flush.
+
+    A flush happens every interval seconds, or as soon as batch_size events
+    are waiting, and again when the process's last connection closes and at
+    exit. If the database is down, buffered events are kept up to
+    max_buffered, and the oldest are dropped and counted past that.
+    """
+
+    def __init__(self, batch_size=200, interval=2.0, max_buffered=10000):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_buffered = max_buffered
+        self.buffer = []
+        self.written = 0
+        self.dropped = 0
+        self.connections = 0
+        self.wakeup = None
+        self.task = None
+
+    def record(self, room_name, kind, user_id='', **data):
+        self.buffer.append(GameEvent(room_name=room_name, kind=kind, user_id=user_id or '', data=data))
+        if len(self.buffer) > self.max_buffered:
+            overflow = len(self.buffer) - self.max_buffered
+            del self.buffer[:overflow]
+            self.dropped += overflow
+        if len(self.buffer) >= self.batch_size and self.wakeup is not None:
+            self.wakeup.set()
+
+    def start(self):
+        # Must be called from the event loop; starting twice is a no-op
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def connected(self):
+        self.connections += 1
+        self.start()
+
+    async def disconnected(self):
+        # Nothing is left waiting for the next interval once the last player goes
+        self.connections = max(self.connections - 1, 0)
+        if not self.connections:
+            await self.flush()
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        while self.buffer:
+            # Detach the batch first; record() may run while the insert is in flight
+            batch, self.buffer = self.buffer[:self.batch_size], self.buffer[self.batch_size:]
+            if not await sync_to_async(self._write)(batch):
+                return
+
+    def close(self):
+        """Write what is still buffered; runs at exit, after the event loop is gone."""
+        while self.buffer:
+            batch, self.buffer = self.buffer[:self.batch_size], self.buffer[self.batch_size:]
+            if not self._write(batch):
+                return
+
+    def _write(self, batch):
+        try:
+            GameEvent.objects.bulk_create(batch)
+        except Exception as e:
+            print(f"Writing {len(batch)} game events failed: {e}")
+            self.buffer[:0] = batch  # Retried on the next flush
+            return False
+        self.written += len(batch)
+        return True
+
+
+_writer = None
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = EventWriter(
+            batch_size=getattr(settings, 'GAME_EVENT_BATCH_SIZE', 200),
+            interval=getattr(settings, 'GAME_EVENT_FLUSH_INTERVAL', 2.0),
+        )
+        atexit.register(_writer.close)
+    return _writer
@@ -0,0 +1,267 @@
+"""Headless multi-seed runner for the Q-learning vs Monte Carlo comparison.
+
+Every (config, seed) trial runs in its own process. Each finished trial is
+appended to a JSON-lines results file as soon as it arrives, so a sweep can
+run unattended and be inspected while it is still going:
+
+    python -m game.experiments --seeds 10 --alpha 0.05 0.1 0.2 --output sweep.jsonl
+    python -m game.experiments --search --alpha 0.05 0.1 0.2 0.5 --epsilon 0.05 0.1 0.2
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')  # Figures are written to files, never shown
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from . import evaluation
+from .result_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache
+from .vector_cartpole import VectorCartPole
+
+try:
+    from scipy import stats
+except ImportError:  # Confidence intervals fall back to the normal approximation
+    stats = None
+
+DEFAULT_CONFIG = {
+    'algorithm': 'q_learning',
+    'num_episodes': 1000,
+    'alpha': 0.1,
+    'gamma': 0.99,
+    'epsilon': 0.1,
+    'num_bins': 10,
+    'num_envs': 64,
+    'eval_episodes': 100,
+}
+
+
+def grid(**options):
+    """Every distinct combination of the given option lists, on top of DEFAULT_CONFIG."""
+    configs = {}
+    for values in itertools.product(*options.values()):
+        config = {**DEFAULT_CONFIG, **dict(zip(options, values))}
+        if config['algorithm'] == 'monte_carlo':
+            config['alpha'] = None  # No step size, so alpha values would only repeat the same run
+        configs.setdefault(config_key(config), config)
+    return list(configs.values())
+
+
+def config_key(config):
+    return json.dumps(config, sort_keys=True)
+
+
+def train(config, seed):
+    """Train one agent with the vectorized learners; returns (Q, rewards per episode)."""
+    np.random.seed(seed)  # epsilon_greedy_batch draws from the global generator
+    vec_env = VectorCartPole(config['num_envs'], seed=seed)
+    if config['algorithm'] == 'q_learning':
+        return evaluation.q_learning_vectorized(vec_env, config['num_episodes'], config['alpha'],
+                                                config['gamma'], config['epsilon'], config['num_bins'])
+    if config['algorithm'] == 'monte_carlo':
+        return evaluation.monte_carlo_vectorized(vec_env, config['num_episodes'], config['gamma'],
+                                                 config['epsilon'], config['num_bins'])
+    raise ValueError(f"Unknown algorithm {config['algorithm']!r}")
+
+
+def train_and_evaluate(config, seed):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        Q, rewards = train(config, seed)
+        # Evaluation starts get their own stream, separate from every training seed
+        eval_env = VectorCartPole(config['eval_episodes'], seed=[seed, 1], autoreset=False)
+        eval_mean, eval_std, lengths = evaluation.evaluate_policy_vectorized(eval_env, Q, config['eval_episodes'],
+                                                                            config['num_bins'])
+    return {'Q': Q, 'rewards': np.asarray(rewards, dtype=float), 'evaluation': np.array([eval_mean, eval_std]),
+            'eval_lengths': lengths}
+
+
+def run_trial(config, seed, cache=None):
+    started = time.perf_counter()
+    params = {**config, 'seed': seed}
+    arrays = cache.get(params) if cache is not None else None
+    cached = arrays is not None
+    if not cached:
+        arrays = train_and_evaluate(config, seed)
+        if cache is not None:
+            cache.put(params, arrays)
+    return {
+        'config': config,
+        'seed': seed,
+        'rewards': arrays['rewards'].tolist(),
+        'eval_mean': float(arrays['evaluation'][0]),
+        'eval_std': float(arrays['evaluation'][1]),
+        'eval_lengths': arrays['eval_lengths'].tolist(),
+        'seconds': time.perf_counter() - started,
+        'cached': cached,
+    }
+
+
+def run_experiments(configs, seeds, results_path, processes=None, cache=None):
+    """Run every config for every seed across a process pool, appending records to results_path.
+
+    processes=None uses every core. Trials found in cache (a ResultCache) are
+    loaded rather than rerun. Returns the records of this run in completion order.
+    """
+    records = []
+    with open(results_path, 'a', encoding='utf-8') as out, ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(run_trial, config, seed, cache) for config in configs for seed in seeds]
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+            records.append(record)
+            source = "cached" if record['cached'] else f"{record['seconds']:.1f} s"
+            print(f"[{done}/{len(futures)}] {record['config']['algorithm']} seed {record['seed']}: "
+                  f"{record['eval_mean']:.1f} ± {record['eval_std']:.1f} ({source})")
+    return records
+
+
+def successive_halving(configs, seeds, results_path, min_episodes=100, max_episodes=1000, keep=0.5,
+                       processes=None, cache=None):
+    """Search configs by training them all briefly, then only the best on bigger budgets.
+
+    Each rung runs every surviving config for every seed with the rung's
+    episode budget, keeps the best `keep` fraction by mean evaluation reward
+    and divides the budget by `keep` for the next rung, until one config is
+    left or max_episodes is reached. Every trial is run with run_experiments,
+    so rungs use the whole pool and a repeated search reuses cached trials;
+    a survivor is retrained from scratch at each new budget. Returns the
+    summary of the last rung.
+    """
+    if not 0 < keep < 1:
+        raise ValueError(f"keep must be between 0 and 1 exclusive, got {keep}")
+    if min_episodes < 1:
+        raise ValueError(f"min_episodes must be at least 1, got {min_episodes}")
+    survivors, episodes = list(configs), min_episodes
+    while True:
+        rung = [{**config, 'num_episodes': episodes} for config in survivors]
+        print(f"Rung: {len(rung)} configs x {len(seeds)} seeds, {episodes} episodes each")
+        records = run_experiments(rung, seeds, results_path, processes, cache)
+        summary = summarize(records)
+        if len(rung) == 1 or episodes >= max_episodes:
+            return summary
+        scores = {}
+        for record in records:
+            scores.setdefault(config_key(record['config']), []).append(record['eval_mean'])
+        rung.sort(key=lambda config: np.mean(scores[config_key(config)]), reverse=True)
+        survivors = rung[:max(1, int(len(rung) * keep))]
+        episodes = min(max_episodes, int(np.ceil(episodes / keep)))
+
+
+def load_results(results_path):
+    with open(results_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def confidence_interval(values, level=0.95):
+    """Half-width of the confidence interval for the mean of values."""
+    n = len(values)
+    if n < 2:
+        return float('nan')
+    if stats is not None:
+        critical = stats.t.ppf((1 + level) / 2, n - 1)
+    else:
+        critical = {0.9: 1.645, 0.95: 1.96, 0.99: 2.576}[level]
+    return critical * np.std(values, ddof=1) / np.sqrt(n)
+
+
+def summarize(records, level=0.95):
+    """One row per config: the evaluation reward's mean, std and confidence interval across seeds."""
+    groups = {}
+    for record in records:
+        groups.setdefault(config_key(record['config']), []).append(record)
+    rows = []
+    for group in groups.values():
+        scores = [record['eval_mean'] for record in group]
+        # Last 100 training episodes, to show where each run finished
+        final = [np.mean(record['rewards'][-100:]) for record in group]
+        ci = confidence_interval(scores, level)
+        rows.append({
+            **group[0]['config'],
+            'seeds': len(group),
+            'eval_mean': np.mean(scores),
+            'eval_std': np.std(scores, ddof=1) if len(scores) > 1 else 0.0,
+            'ci_low': np.mean(scores) - ci,
+            'ci_high': np.mean(scores) + ci,
+            'final_train_mean': np.mean(final),
+        })
+    return pd.DataFrame(rows).sort_values('eval_mean', ascending=False, ignore_index=True)
+
+
+def plot_learning_curves(records, path, level=0.95):
+    """Save each config's mean reward-vs-episode curve, with a confidence band across seeds."""
+    groups = {}
+    for record in records:
+        groups.setdefault(config_key(record['config']), []).append(record)
+    plt.figure(figsize=(10, 6))
+    for group in groups.values():
+        curves = np.array([record['rewards'] for record in group])
+        mean = curves.mean(axis=0)
+        config = group[0]['config']
+        label = ', '.join(f"{name}={value}" for name, value in config.items()
+                          if name in ('algorithm', 'alpha', 'gamma', 'epsilon', 'num_bins'))
+        line, = plt.plot(mean, label=label)
+        if len(group) > 1:
+            ci = np.array([confidence_interval(column, level) for column in curves.T])
+            plt.fill_between(np.arange(len(mean)), mean - ci, mean + ci, color=line.get_color(), alpha=0.2)
+    plt.xlabel('Episodes', fontsize=12)
+    plt.ylabel('Reward', fontsize=12)
+    plt.title('Reward vs Episodes', fontsize=12)
+    plt.legend(fontsize=8)
+    plt.savefig(path, bbox_inches='tight')
+    plt.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--algorithm', nargs='+', default=['q_learning', 'monte_carlo'])
+    parser.add_argument('--alpha', nargs='+', type=float, default=[DEFAULT_CONFIG['alpha']])
+    parser.add_argument('--gamma', nargs='+', type=float, default=[DEFAULT_CONFIG['gamma']])
+    parser.add_argument('--epsilon', nargs='+', type=float, default=[DEFAULT_CONFIG['epsilon']])
+    parser.add_argument('--num-bins', nargs='+', type=int, default=[DEFAULT_CONFIG['num_bins']])
+    parser.add_argument('--episodes', type=int, default=DEFAULT_CONFIG['num_episodes'],
+                        help="Episodes per trial; with --search, the budget of the last rung")
+    parser.add_argument('--seeds', type=int, default=5, help="Seeds 0..N-1 are run for every config")
+    parser.add_argument('--processes', type=int, default=None, help="Defaults to every core")
+    parser.add_argument('--output', default='results.jsonl', help="JSON-lines file; new records are appended")
+    parser.add_argument('--plot', default=None, help="Also save the learning curves to this image")
+    parser.add_argument('--search', action='store_true', help="Successive halving instead of the full grid")
+    parser.add_argument('--min-episodes', type=int, default=100, help="Budget of the first search rung")
+    parser.add_argument('--keep', type=float, default=0.5, help="Fraction of configs kept after each rung")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--cache-size-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    parser.add_argument('--no-cache', action='store_true', help="Retrain every trial and store nothing")
+    args = parser.parse_args(argv)
+    if not 0 < args.keep < 1:
+        parser.error("--keep must be between 0 and 1 exclusive")  # Otherwise no rung ever grows
+    if args.min_episodes < 1:
+        parser.error("--min-episodes must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configs = grid(algorithm=args.algorithm, alpha=args.alpha, gamma=args.gamma, epsilon=args.epsilon,
+                   num_bins=args.num_bins, num_episodes=[args.episodes])
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_size_mb * 1024 * 1024)
+    if args.search:
+        summary = successive_halving(configs, range(args.seeds), args.output, args.min_episodes, args.episodes,
+                                     args.keep, args.processes, cache)
+        print(summary.to_string())
+        print("Best config:", summary.iloc[0][list(DEFAULT_CONFIG)].to_dict())
+        return
+    records = run_experiments(configs, range(args.seeds), args.output, args.processes, cache)
+    print(summarize(records).to_string())
+    if args.plot:
+        plot_learning_curves(records, args.plot)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import itertools
+import json
+import uuid
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .models import GameEvent
+from .rl_model import choose_word, suggest_steps
+from . import event_log, room_state
+
+
+def group_name(room_name):
+    return f'game_{room_name}'
+
+
+async def broadcast(room_name, action, **fields):
+    await group_event(room_name, 'send_frame', action, fields)
+
+
+async def group_event(room_name, event_type, action, fields, **extra):
+    # Serialize the frame once; every member of the group forwards the same text.
+    # extra travels beside it for handlers that also update process state.
+    await get_channel_layer().group_send(
+        group_name(room_name),
+        {
+            'type': event_type,
+            'text': json.dumps({'action': action, **fields}),
+            **extra
+        }
+    )
+
+
+async def get_user_by_turn(room_name, turn):
+    return await room_state.get_cache().drawer(room_name, turn)
+
+
+async def start_turn(room_name, drawer):
+    word = choose_word(room_name)
+    steps = suggest_steps(word)
+
+    # Update the current word for the room
+    await room_state.save_word(room_name, word)
+    await room_state.get_cache().set(room_name, word)  # Guess checks read it from here
+    event_log.get_writer().record(room_name, GameEvent.TURN, drawer, word=word)
+    print(f"Drawer: {drawer}, Word: {word}")
+    # Notify the drawer
+    await get_channel_layer().send(
+        drawer,
+        {
+            'type': 'new_word',
+            'word': word,
+            'steps': steps,
+            'drawer': drawer  # Include drawer information
+        }
+    )
+
+    # Notify others
+    await broadcast(room_name, 'turn', drawer=drawer, word=word, steps=steps)
+    # Each process resets its own stroke log when it handles this
+    await group_event(room_name, 'clear_canvas', 'clear_canvas', {}, turn=uuid.uuid4().hex)
+
+
+async def next_turn(room_name):
+    drawer = await room_state.advance_turn(room_name)
+    if drawer is None:
+        get_scheduler().cancel_room(room_name)  # Everyone left; stop rotating
+        await room_state.get_cache().closed(room_name)
+        return
+    drawer_user = await get_user_by_turn(room_name, drawer)
+    await start_turn(room_name, drawer_user)
+
+
+class RoomScheduler:
+    """Runs turn rotation for every room in the process from one task.
+
+    Each running room has one deadline in a heap. When it falls due, the room's
+    next deadline is pushed and on_deadline(room_name) runs as its own task, so
+    a slow turn never delays other rooms. Starting a running room does
+    nothing. Cancelling a room forgets its deadline; the heap entry is skipped
+    when it comes up.
+    """
+
+    def __init__(self, on_deadline, turn_seconds=60):
+        self.on_deadline = on_deadline
+        self.turn_seconds = turn_seconds
+        self.deadlines = []  # (when, ticket, room name)
+        self.tickets = {}  # Room name -> ticket of its live deadline
+        self.counter = itertools.count()
+        self.wakeup = None
+        self.task = None
+        self.firing = set()  # Turn tasks in flight; the loop itself only keeps weak references
+
+    def __contains__(self, room_name):
+        return room_name in self.tickets
+
+    def start_room(self, room_name, delay=None):
+        """Rotate turns in room_name every turn_seconds; False if it already is."""
+        if room_name in self.tickets:
+            return False
+        self._schedule(room_name, self.turn_seconds if delay is None else delay)
+        self._ensure_running()
+        return True
+
+    def cancel_room(self, room_name):
+        return self.tickets.pop(room_name, None) is not None
+
+    def _schedule(self, room_name, delay):
+        ticket = next(self.counter)
+        self.tickets[room_name] = ticket
+        when = asyncio.get_running_loop().time() + delay
+        heapq.heappush(self.deadlines, (when, ticket, room_name))
+        if self.wakeup is not None and self.deadlines[0][1] == ticket:
+            self.wakeup.set()  # New earliest deadline; the sleeping loop must recompute
+
+    def _ensure_running(self):
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            while self.deadlines and self.deadlines[0][0] <= now:
+                _, ticket, room_name = heapq.heappop(self.deadlines)
+                if self.tickets.get(room_name) != ticket:
+                    continue  # Cancelled or restarted since this deadline was pushed
+                self._schedule(room_name, self.turn_seconds)
+                task = loop.create_task(self._fire(room_name))
+                self.firing.add(task)
+                task.add_done_callback(self.firing.discard)
+            timeout = self.deadlines[0][0] - now if self.deadlines else None
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, room_name):
+        try:
+            await self.on_deadline(room_name)
+        except Exception as e:
+            print(f"Turn in room {room_name} failed: {e}")
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RoomScheduler(next_turn, turn_seconds=getattr(settings, 'GAME_TURN_SECONDS', 60))
+    return _scheduler
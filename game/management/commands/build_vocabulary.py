@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from game.vocabulary import build_vocabulary_from_json
+
+
+class Command(BaseCommand):
+    help = "Build the memory-mapped vocabulary file from a JSON word list"
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', nargs='?', default=str(settings.RL_VOCABULARY_SOURCE),
+                            help="JSON list of {word, difficulty, category, steps} objects")
+        parser.add_argument('--output', default=str(settings.RL_VOCABULARY_PATH))
+
+    def handle(self, *args, **options):
+        build_vocabulary_from_json(options['source'], options['output'])
+        self.stdout.write(f"Wrote {options['output']}")
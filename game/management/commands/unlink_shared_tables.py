@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from game import agents
+from game.shared_arrays import list_shared_arrays, unlink_shared_array
+
+
+class Command(BaseCommand):
+    help = ("Unlink shared memory Q-tables and word tables left behind by an older "
+            "vocabulary, bin count or action count")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help="Also unlink the tables the current settings use; stop the workers first")
+        parser.add_argument('--dry-run', action='store_true', help="Only list what would be unlinked")
+
+    def handle(self, *args, **options):
+        prefix = f"{getattr(settings, 'RL_SHARED_TABLE_NAME', 'drawing_game')}_"
+        # Building the agent names the segments the current settings map to
+        current = set() if options['all'] else set(agents.get_agent().shared_segments)
+        for name in list_shared_arrays(prefix):
+            if name in current:
+                self.stdout.write(f"Keeping {name}")
+                continue
+            if not options['dry_run']:
+                unlink_shared_array(name)
+            self.stdout.write(f"{'Would unlink' if options['dry_run'] else 'Unlinked'} {name}")
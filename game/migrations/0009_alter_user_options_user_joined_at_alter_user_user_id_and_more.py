@@ -0,0 +1,36 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_room_current_word_alter_room_current_drawer_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'ordering': ['joined_at', 'id']},
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='joined_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='user_id',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['room', 'user_id'], name='game_user_room_id_ce04db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['room', 'joined_at'], name='game_user_room_id_5f35a7_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0009_alter_user_options_user_joined_at_alter_user_user_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_name', models.CharField(max_length=255)),
+                ('kind', models.CharField(choices=[('guess', 'Guess'), ('correct_guess', 'Correct guess'), ('turn', 'Turn')], max_length=32)),
+                ('user_id', models.CharField(blank=True, max_length=255)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['room_name', 'created_at'], name='game_gameev_room_na_7cef84_idx'), models.Index(fields=['kind', 'created_at'], name='game_gameev_kind_f2a1d3_idx')],
+            },
+        ),
+    ]
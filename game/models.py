@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class Room(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -11,8 +12,42 @@ class Room(models.Model):
 
 class User(models.Model):
     username = models.CharField(max_length=255)
-    user_id = models.CharField(max_length=255)
+    user_id = models.CharField(max_length=255, db_index=True)
     room = models.ForeignKey(Room, related_name='user_set', on_delete=models.CASCADE)
+    joined_at = models.DateTimeField(default=timezone.now)  # Turn order follows join order
+
+    class Meta:
+        ordering = ['joined_at', 'id']
+        indexes = [
+            models.Index(fields=['room', 'user_id']),
+            models.Index(fields=['room', 'joined_at']),
+        ]
 
     def __str__(self):
         return self.username
+
+class GameEvent(models.Model):
+    """Append-only history of guesses and turns, written in batches by event_log."""
+    GUESS = 'guess'
+    CORRECT_GUESS = 'correct_guess'
+    TURN = 'turn'
+    KIND_CHOICES = [
+        (GUESS, 'Guess'),
+        (CORRECT_GUESS, 'Correct guess'),
+        (TURN, 'Turn'),
+    ]
+
+    room_name = models.CharField(max_length=255)  # Kept by name so history outlives the room
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    user_id = models.CharField(max_length=255, blank=True)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['room_name', 'created_at']),
+            models.Index(fields=['kind', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} in {self.room_name}"
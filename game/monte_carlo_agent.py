@@ -1,5 +1,7 @@
 import numpy as np
 import random
+from .discretizer import StateDiscretizer
+from .word_samplers import FenwickSampler
 
 class MonteCarloAgent:
     def __init__(self, env, alpha=0.1):
@@ -7,10 +9,13 @@ class MonteCarloAgent:
         self.alpha = alpha  # Learning rate
         self.q_table = {}  # Initialize the Q-table
         self.state_bins = self.create_bins(env.observation_space)
+        self.discretizer = StateDiscretizer(self.state_bins)
 
         self.word_q_table = {}  # Q-table for word difficulties
         self.word_returns_sum = {}
         self.word_returns_count = {}
+        self.word_sampler = None  # Built over the word list choose_word is given
+        self.sampler_words = None
 
     def create_bins(self, observation_space, num_bins=10):
         bins = []
@@ -21,10 +26,11 @@ class MonteCarloAgent:
         return bins
 
     def discretize_state(self, state):
-        state_indices = []
-        for i in range(len(state)):
-            state_indices.append(np.digitize(state[i], self.state_bins[i]) - 1)
-        return tuple(state_indices)
+        return tuple(int(i) for i in self.discretizer.bin_indices(state) - 1)
+
+    def state_index(self, states):
+        # Flat index of one state, or an array of indices for a batch of states
+        return self.discretizer.flat_index(states)
 
     def choose_action(self, state):
         # keeping it similar for simplicity
@@ -56,10 +62,19 @@ class MonteCarloAgent:
         self.word_returns_sum[word] += reward
         self.word_returns_count[word] += 1
         self.word_q_table[word] = self.word_returns_sum[word] / self.word_returns_count[word]
+        if self.word_sampler is not None and word in self.word_sampler:
+            self.word_sampler.update(word, self.word_weight(word))
+
+    def word_weight(self, word):
+        # Words that are guessed less often are drawn more often
+        return 1 / (self.word_q_table.get(word, 1) + 1)
 
     def choose_word(self, words):
         if not self.word_q_table:
             return random.choice(words)
-        word_probs = [1 / (self.word_q_table.get(word, 1) + 1) for word in words]
-        word_probs = word_probs / np.sum(word_probs)
-        return np.random.choice(words, p=word_probs)
+        # The sampler is rebuilt only when the word list changes; pass the same
+        # list every turn to keep choosing and adjusting at O(log V)
+        if self.word_sampler is None or (words is not self.sampler_words and list(words) != self.word_sampler.items):
+            self.word_sampler = FenwickSampler(words, [self.word_weight(word) for word in words])
+            self.sampler_words = words
+        return self.word_sampler.sample()
@@ -1,16 +1,55 @@
 import numpy as np
 import random
+import time
+from .discretizer import StateDiscretizer
+from .q_tables import DenseQTable, WordTable, words_fingerprint
+from .shared_arrays import shared_array
+from .word_samplers import IndexedMaxHeap
+
+DEFAULT_WORDS = ["apple", "banana", "cat", "dog", "elephant"]
+WORD_HEAP_REFRESH = 5  # Seconds before a heap over a shared word table is rebuilt
 
 class QLearningAgent:
-    def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=0.1):
+    def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=0.1, q_backend='dict', shared_name='drawing_game', words=DEFAULT_WORDS,
+                 word_epsilon=0.1, word_top_k=3):
         self.actions = list(range(env.action_space.n))  # List of possible actions
         self.alpha = alpha  # Learning rate
         self.gamma = gamma  # Discount factor
         self.epsilon = epsilon  # Exploration rate
-        self.q_table = {}  # Initialize the Q-table
         self.state_bins = self.create_bins(env.observation_space)
+        self.discretizer = StateDiscretizer(self.state_bins)
+        self.words = words  # Any sequence, e.g. a Vocabulary
+        n_states, n_actions = self.discretizer.n_states, len(self.actions)
+        if q_backend == 'dense':
+            # Preallocated array indexed by the flattened discretized state
+            self.q_table = DenseQTable(n_states, n_actions)
+        elif q_backend == 'shared':
+            # Same layout, but in shared memory so every worker process on the
+            # host reads and updates one table. Reads take no lock and updates
+            # are applied Hogwild-style; an occasional lost update is harmless.
+            # The shape is part of the name, so a table with other bins or actions never
+            # attaches to this one's rows
+            q_name = f'{shared_name}_q_{n_states}x{n_actions}'
+            self.q_table = DenseQTable(n_states, n_actions, values=shared_array(q_name, (n_states, n_actions)))
+        elif q_backend == 'dict':
+            self.q_table = {}  # Initialize the Q-table
+        else:
+            raise ValueError(f"Unknown Q-table backend: {q_backend}")
+        self.q_backend = q_backend
+        self.dense = q_backend in ('dense', 'shared')
 
-        self.word_q_table = {}  # Q-table for word difficulties
+        if q_backend == 'shared':
+            # Values are indexed by vocabulary slot, so a changed vocabulary gets a fresh segment
+            words_name = f'{shared_name}_words_{words_fingerprint(self.words)}'
+            self.word_q_table = WordTable(self.words, shared_array(words_name, (2, len(self.words))))
+            self.shared_segments = [q_name, words_name]
+        else:
+            self.shared_segments = []
+            self.word_q_table = {}  # Q-table for word difficulties
+        self.word_epsilon = word_epsilon  # Chance of picking any word instead of one of the top words
+        self.word_top_k = word_top_k
+        self.word_heap = None  # Words ranked by value, built on first use
+        self.word_heap_built = 0.0
 
     def create_bins(self, observation_space, num_bins=10):
         bins = []
@@ -21,10 +60,11 @@ class QLearningAgent:
         return bins
 
     def discretize_state(self, state):
-        state_indices = []
-        for i in range(len(state)):
-            state_indices.append(np.digitize(state[i], self.state_bins[i]) - 1)
-        return tuple(state_indices)
+        return tuple(int(i) for i in self.discretizer.bin_indices(state) - 1)
+
+    def state_index(self, states):
+        # Flat index of one state, or an array of indices for a batch of states
+        return self.discretizer.flat_index(states)
 
     def choose_action(self, state):
         # Epsilon-greedy action selection
@@ -35,11 +75,19 @@ class QLearningAgent:
         return action
 
     def get_best_action(self, state):
+        if self.dense:
+            return self.q_table.best_action(self.state_index(state))
         state = self.discretize_state(state)
         self.q_table.setdefault(state, {action: 0 for action in self.actions})
         return max(self.q_table[state], key=self.q_table[state].get)
 
     def update_q_table(self, state, action, reward, next_state):
+        if self.dense:
+            self.q_table.update(
+                self.state_index(state), action, reward,
+                self.state_index(next_state), self.alpha, self.gamma
+            )
+            return
         print(state, action, reward, next_state)
         state = self.discretize_state(state)
         next_state = self.discretize_state(next_state)
@@ -50,11 +98,43 @@ class QLearningAgent:
             reward + self.gamma * self.q_table[next_state][best_next_action] - self.q_table[state][action]
         )
 
+    def update_q_table_batch(self, states, actions, rewards, next_states):
+        if self.dense:
+            self.q_table.update_batch(
+                self.state_index(states), actions, rewards,
+                self.state_index(next_states), self.alpha, self.gamma
+            )
+            return
+        for transition in zip(states, actions, rewards, next_states):
+            self.update_q_table(*transition)
+
     def adjust_word_difficulty(self, word, reward):
         self.word_q_table.setdefault(word, 0)
         self.word_q_table[word] += self.alpha * (reward - self.word_q_table[word])
+        if self.word_heap is not None:
+            self.word_heap.update(word, self.word_q_table[word])
+
+    def word_ranking(self):
+        shared = self.q_backend == 'shared'
+        if self.word_heap is None:
+            # Every word is ranked, unseen ones at the default value of 0
+            if shared:
+                values = self.word_q_table.snapshot()
+            else:
+                values = {word: self.word_q_table.get(word, 0) for word in self.words}
+                for word in self.word_q_table:
+                    values.setdefault(word, self.word_q_table[word])
+            self.word_heap = IndexedMaxHeap(values)
+            self.word_heap_built = time.monotonic()
+        elif shared and time.monotonic() - self.word_heap_built > WORD_HEAP_REFRESH:
+            # Other workers also write the shared table; pick up only the words they changed
+            for slot in self.word_q_table.changed_slots():
+                self.word_heap.update(self.words[slot], float(self.word_q_table.values[slot]))
+            self.word_heap_built = time.monotonic()
+        return self.word_heap
 
     def choose_word(self):
-        if not self.word_q_table:
-            return random.choice(["apple", "banana", "cat", "dog", "elephant"])
-        return max(self.word_q_table, key=self.word_q_table.get)
+        # Explore over the whole vocabulary, otherwise vary among the best words
+        if np.random.uniform(0, 1) < self.word_epsilon:
+            return random.choice(self.words)
+        return random.choice(self.word_ranking().top_k(self.word_top_k))
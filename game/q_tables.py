@@ -0,0 +1,120 @@
+import zlib
+
+import numpy as np
+
+
+class DenseQTable:
+    """Q-values stored in one preallocated array, one row per discretized state.
+
+    Rows are the flat state indices produced by StateDiscretizer.flat_index.
+    """
+
+    def __init__(self, n_states, n_actions, values=None, dtype=np.float64):
+        self.n_actions = n_actions
+        # values may be supplied to back the table with shared memory
+        self.values = np.zeros((n_states, n_actions), dtype=dtype) if values is None else values
+
+    def best_action(self, index):
+        return int(self.values[index].argmax())
+
+    def best_actions(self, indices):
+        return self.values[indices].argmax(axis=1)
+
+    def update(self, index, action, reward, next_index, alpha, gamma):
+        row = self.values[index]
+        row[action] += alpha * (reward + gamma * self.values[next_index].max() - row[action])
+
+    def update_batch(self, indices, actions, rewards, next_indices, alpha, gamma):
+        targets = rewards + gamma * self.values[next_indices].max(axis=1)
+        # Transitions that hit the same state-action pair are folded into one update:
+        # c sequential updates towards the same target move Q by 1 - (1 - alpha)^c of the gap
+        flat = np.ravel_multi_index((indices, actions), self.values.shape)
+        pairs, which, counts = np.unique(flat, return_inverse=True, return_counts=True)
+        mean_targets = np.bincount(which, weights=targets) / counts
+        rows, cols = np.divmod(pairs, self.values.shape[1])
+        self.values[rows, cols] += (1 - (1 - alpha) ** counts) * (mean_targets - self.values[rows, cols])
+
+
+def words_fingerprint(words):
+    """Short checksum of a word list, changing whenever a word or its slot does."""
+    if hasattr(words, 'fingerprint'):
+        return words.fingerprint()
+    checksum = zlib.crc32('\n'.join(words).encode())
+    return f'{checksum:08x}'
+
+
+class WordTable:
+    """Word values stored in a (2, V) array over a fixed vocabulary.
+
+    Row 0 holds the values and row 1 flags the words that have one. The
+    class behaves like the dict QLearningAgent otherwise uses for
+    word_q_table, so the array can live in shared memory. Words outside the
+    vocabulary are kept in a plain dict local to this process. Slots only
+    mean something for one word list, so name a shared array after its
+    words_fingerprint.
+    """
+
+    def __init__(self, words, array):
+        self.words = words
+        # A Vocabulary finds slots itself; plain lists get a dict
+        self.slot = words.lookup if hasattr(words, 'lookup') else {word: i for i, word in enumerate(words)}.get
+        self.values = array[0]
+        self.seen = array[1]
+        self.extra = {}
+        self.synced = None  # Copy of values as of the last snapshot() or changed_slots()
+
+    def __contains__(self, word):
+        slot = self.slot(word)
+        return word in self.extra if slot is None else bool(self.seen[slot])
+
+    def __getitem__(self, word):
+        slot = self.slot(word)
+        if slot is None:
+            return self.extra[word]
+        if not self.seen[slot]:
+            raise KeyError(word)
+        return float(self.values[slot])
+
+    def __setitem__(self, word, value):
+        slot = self.slot(word)
+        if slot is None:
+            self.extra[word] = value
+            return
+        self.values[slot] = value
+        self.seen[slot] = 1
+
+    def get(self, word, default=None):
+        return self[word] if word in self else default
+
+    def setdefault(self, word, default=None):
+        if word not in self:
+            self[word] = default
+        return self[word]
+
+    def __iter__(self):
+        for slot in np.flatnonzero(self.seen):
+            yield self.words[slot]
+        yield from self.extra
+
+    def __len__(self):
+        return int(np.count_nonzero(self.seen)) + len(self.extra)
+
+    def snapshot(self):
+        """Value of every word, unseen ones at 0, and start tracking changes from here."""
+        self.synced = self.values.copy()
+        values = dict(zip(self.words, self.synced.tolist()))
+        values.update(self.extra)
+        return values
+
+    def changed_slots(self):
+        """Slots whose value changed since the last call or snapshot, by any process.
+
+        The comparison runs in NumPy, so only the changed words are ever
+        decoded or looked up.
+        """
+        if self.synced is None:
+            self.snapshot()
+            return np.arange(len(self.values))
+        slots = np.flatnonzero(self.values != self.synced)
+        self.synced[slots] = self.values[slots]
+        return slots
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+import numpy as np
+
+
+class ReplayBuffer:
+    """Bounded ring buffer of (state, action, reward, next_state) transitions.
+
+    Transitions live in preallocated NumPy arrays. Once the buffer is full a
+    push overwrites the oldest transition that has not been consumed yet.
+    Pushes may come from sync_to_async threads, so access is locked.
+    """
+
+    def __init__(self, capacity, state_dim):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_dim))
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity)
+        self.next_states = np.zeros((capacity, state_dim))
+        self.start = 0  # Slot of the oldest transition
+        self.size = 0
+        self.overwritten = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, next_state):
+        with self.lock:
+            i = (self.start + self.size) % self.capacity
+            self.states[i] = state
+            self.actions[i] = action
+            self.rewards[i] = reward
+            self.next_states[i] = next_state
+            if self.size == self.capacity:
+                self.start = (self.start + 1) % self.capacity
+                self.overwritten += 1
+            else:
+                self.size += 1
+
+    def pop(self, n):
+        """Remove and return up to n of the oldest transitions as arrays."""
+        with self.lock:
+            n = min(n, self.size)
+            slots = (self.start + np.arange(n)) % self.capacity
+            batch = (self.states[slots], self.actions[slots], self.rewards[slots], self.next_states[slots])
+            self.start = (self.start + n) % self.capacity
+            self.size -= n
+        return batch
+
+
+class BatchLearner:
+    """Applies queued transitions to an agent in mini-batches from a background task."""
+
+    def __init__(self, agent, buffer, batch_size=64, interval=0.5):
+        self.agent = agent
+        self.buffer = buffer
+        self.batch_size = batch_size
+        self.interval = interval  # Seconds between passes over the buffer
+        self.task = None
+        self.batches = 0
+
+    def push(self, state, action, reward, next_state):
+        self.buffer.push(state, action, reward, next_state)
+
+    def start(self):
+        # Must be called from the event loop; starting twice is a no-op
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            while len(self.buffer):
+                try:
+                    self.agent.update_q_table_batch(*self.buffer.pop(self.batch_size))
+                except Exception as e:
+                    print(f"Learner batch failed: {e}")
+                self.batches += 1
+                await asyncio.sleep(0)  # Let consumers run between batches
@@ -0,0 +1,86 @@
+import functools
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .checkpoints import load_checkpoint, save_checkpoint
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'evaluation')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Source files whose behaviour decides what a training run produces
+CODE_FILES = ('evaluation.py', 'vector_cartpole.py', 'experiments.py')
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Hash of the training and evaluation code, so editing it invalidates old results."""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in CODE_FILES:
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Content-addressed store of trained Q arrays and reward curves.
+
+    An entry is keyed by a hash of its parameters (algorithm, hyperparameters,
+    episodes, seed) and the code version, and is one checkpoint file. When
+    the directory grows past max_bytes, the least recently used entries are
+    deleted.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, params):
+        text = json.dumps({'params': params, 'code': code_version()}, sort_keys=True)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def path(self, params):
+        return os.path.join(self.directory, f'{self.key(params)}.ckpt')
+
+    def get(self, params):
+        path = self.path(params)
+        arrays = load_checkpoint(path, mode='r')
+        if arrays is None:
+            return None
+        os.utime(path)  # Mark as recently used
+        # Copy out of the mapping so eviction can delete the file underneath
+        return {name: np.array(array) for name, array in arrays.items()}
+
+    def put(self, params, arrays):
+        save_checkpoint(self.path(params), arrays)
+        self.evict()
+
+    def get_or_compute(self, params, compute):
+        """Cached arrays for params, or compute() them, store them and return them."""
+        arrays = self.get(params)
+        if arrays is None:
+            arrays = compute()
+            self.put(params, arrays)
+        return arrays
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.ckpt'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:  # Evicted by another process
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
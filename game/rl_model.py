@@ -3,28 +3,26 @@ import base64
 import numpy as np
 from PIL import Image
 import io
-from .models import Room
-from .q_learning_agent import QLearningAgent
-import gym
-
-agent = QLearningAgent(gym.make('CartPole-v1'))  # Initialize the Q-learning agent
+from .agents import get_agent, get_learner, get_vocabulary
 
 def choose_word(room_name):
-    return agent.choose_word()
+    return get_agent().choose_word()
 
 def adjust_word_difficulty(word, correct_guess):
     reward = 1 if correct_guess else -1
-    agent.adjust_word_difficulty(word, reward)
+    get_agent().adjust_word_difficulty(word, reward)
 
 def suggest_steps(word):
+    steps = get_vocabulary().steps(word)
+    if steps:
+        return steps
     return [f"Step 1: Draw the {word}", f"Step 2: Add details to the {word}"]
 
 def provide_suggestions(drawing):
     return "Try to add more details to your drawing."
 
-def check_guess(room_name, guess):
-    room = Room.objects.get(name=room_name)
-    return room.current_word.lower() == guess.lower()
+def check_guess(current_word, guess):
+    return current_word is not None and current_word.lower() == guess.lower()
 
 def update_model(room_name, data):
     drawing = data.get('drawing')
@@ -33,10 +31,10 @@ def update_model(room_name, data):
         return  # Skip the update if no drawing data
 
     state = get_state(drawing)
-    action = agent.choose_action(state)
-    next_state = agent.simulate_next_state(state, action, drawing)
-    reward = agent.calculate_reward(drawing, data.get('guess'))
-    agent.update_q_table(state, action, reward, next_state)
+    action = get_agent().choose_action(state)
+    next_state = simulate_next_state(state, action, drawing)
+    reward = 1  # Fixed reward, as in GameConsumer.calculate_reward
+    get_learner().push(state, action, reward, next_state)
 
 
 def simulate_next_state(state, action, drawing):
@@ -0,0 +1,209 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.db import connection, transaction
+
+from .models import Room, User
+
+GROUP_REFRESH = 3600  # Seconds; re-joining well inside the layer's group expiry
+
+
+class RoomStateCache:
+    """Current word and ordered roster of each room, kept in process memory.
+
+    start_turn writes the new word through set(), and joins and leaves
+    update the roster, so the process that made a change is always up to
+    date. Every other process hears about it on the channel layer and drops
+    that entry; the next lookup there reloads it from the database. A lookup
+    that hits the cache costs no query and no thread hop. Once a room empties
+    every process forgets it, so entries don't outlive their rooms.
+    """
+
+    group = 'room_state'
+
+    def __init__(self):
+        self.words = {}
+        self.rosters = {}  # Room name -> user ids in join order
+        self.versions = {}  # (field, room name) -> invalidation count, so stale reloads are discarded
+        self.channel = None
+        self.task = None
+
+    def start(self):
+        # Idempotent; every connection calls it
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.listen())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def listen(self):
+        layer = get_channel_layer()
+        self.channel = await layer.new_channel()
+        rejoin_at = 0.0
+        while True:
+            if time.monotonic() >= rejoin_at:
+                await layer.group_add(self.group, self.channel)
+                rejoin_at = time.monotonic() + GROUP_REFRESH
+            try:
+                message = await asyncio.wait_for(layer.receive(self.channel), GROUP_REFRESH)
+            except asyncio.TimeoutError:
+                continue
+            if message.get('origin') == self.channel:
+                continue
+            if message.get('field') == 'room':
+                self.forget(message['room'])
+            else:
+                self.invalidate(message['room'], message.get('field', 'word'))
+
+    def _entries(self, field):
+        return self.words if field == 'word' else self.rosters
+
+    def invalidate(self, room_name, field='word'):
+        key = (field, room_name)
+        self.versions[key] = self.versions.get(key, 0) + 1
+        self._entries(field).pop(room_name, None)
+
+    def forget(self, room_name):
+        """Drop everything cached about a room, e.g. once it is empty."""
+        self.words.pop(room_name, None)
+        self.rosters.pop(room_name, None)
+        self.versions.pop(('word', room_name), None)
+        self.versions.pop(('roster', room_name), None)
+
+    async def _publish(self, room_name, field):
+        await get_channel_layer().group_send(self.group, {
+            'type': 'room_state.invalidate',
+            'room': room_name,
+            'field': field,
+            'origin': self.channel,
+        })
+
+    def _load(self, room_name, field, version):
+        if field == 'word':
+            value = Room.objects.filter(name=room_name).values_list('current_word', flat=True).first()
+        else:
+            # User's default ordering is join order, served by the (room, joined_at) index
+            value = list(User.objects.filter(room__name=room_name).values_list('user_id', flat=True))
+        if self.versions.get((field, room_name), 0) == version:
+            self._entries(field)[room_name] = value
+        return value
+
+    async def _get(self, room_name, field):
+        try:
+            return self._entries(field)[room_name]
+        except KeyError:
+            return await sync_to_async(self._load)(room_name, field, self.versions.get((field, room_name), 0))
+
+    async def current_word(self, room_name):
+        return await self._get(room_name, 'word')
+
+    async def set(self, room_name, word):
+        """Record a word the caller has already saved, and tell other processes."""
+        self.invalidate(room_name, 'word')
+        self.words[room_name] = word
+        await self._publish(room_name, 'word')
+
+    async def roster(self, room_name):
+        return await self._get(room_name, 'roster')
+
+    async def drawer(self, room_name, turn):
+        """User id of the turn'th drawer in join order, or None for an empty room."""
+        roster = await self.roster(room_name)
+        return roster[turn % len(roster)] if roster else None
+
+    async def joined(self, room_name, user_id):
+        """Record a join the caller has already saved, and tell other processes."""
+        roster = self.rosters.get(room_name)
+        self.invalidate(room_name, 'roster')
+        if roster is not None:
+            self.rosters[room_name] = roster + [user_id]
+        await self._publish(room_name, 'roster')
+
+    async def left(self, room_name, user_id):
+        """Record a leave the caller has already saved, and tell other processes."""
+        roster = self.rosters.get(room_name)
+        self.invalidate(room_name, 'roster')
+        if roster is not None:
+            self.rosters[room_name] = [member for member in roster if member != user_id]
+        await self._publish(room_name, 'roster')
+
+    async def closed(self, room_name):
+        """Forget a room that has emptied, here and in every other process."""
+        self.forget(room_name)
+        await self._publish(room_name, 'room')
+
+
+# Membership and turn changes. Each runs in one thread hop. Counters are
+# changed in the UPDATE itself, so concurrent joins and leaves can't
+# overwrite each other, and the UPDATE reads the new values back with
+# RETURNING (SQLite 3.35+, PostgreSQL) instead of a second SELECT.
+
+def _update_room(sql, params):
+    """Run an UPDATE ... RETURNING on the room table; the returned row, or None if no room matched."""
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(room=connection.ops.quote_name(Room._meta.db_table)), params)
+        return cursor.fetchone()
+
+
+@sync_to_async
+def join_room(room_name, username, user_id):
+    """Add a user to the room, creating the room if needed; returns the new user count."""
+    join = "UPDATE {room} SET users = users + 1 WHERE name = %s RETURNING id, users"
+    with transaction.atomic():
+        row = _update_room(join, [room_name])
+        if row is None:
+            Room.objects.get_or_create(name=room_name)  # Only a new room costs more
+            row = _update_room(join, [room_name])
+        room_id, users = row
+        User.objects.create(username=username, user_id=user_id, room_id=room_id)
+        return users
+
+
+@sync_to_async
+def leave_room(room_name, user_id):
+    """Remove a user's entries from the room; returns the new user count, or None without a room."""
+    with transaction.atomic():
+        removed, _ = User.objects.filter(room__name=room_name, user_id=user_id).delete()
+        row = _update_room(
+            "UPDATE {room} SET users = CASE WHEN users > %s THEN users - %s ELSE 0 END WHERE name = %s RETURNING users",
+            [removed, removed, room_name])
+        return None if row is None else row[0]
+
+
+@sync_to_async
+def user_count(room_name):
+    return Room.objects.filter(name=room_name).values_list('users', flat=True).first() or 0
+
+
+@sync_to_async
+def reset_turn(room_name):
+    Room.objects.filter(name=room_name).update(current_drawer=0)
+
+
+@sync_to_async
+def advance_turn(room_name):
+    """Move the room to its next drawer; returns the drawer's index, or None if the room is empty."""
+    row = _update_room(
+        "UPDATE {room} SET current_drawer = (current_drawer + 1) %% users WHERE name = %s AND users > 0 "
+        "RETURNING current_drawer",
+        [room_name])
+    return None if row is None else row[0]
+
+
+@sync_to_async
+def save_word(room_name, word):
+    Room.objects.filter(name=room_name).update(current_word=word)
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = RoomStateCache()
+    return _cache
@@ -0,0 +1,67 @@
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+SHM_DIR = '/dev/shm'  # Where Linux keeps named segments; other systems can't list theirs
+
+# Segments attached by this process, kept alive for as long as it runs
+_segments = {}
+_retired = []
+
+
+def shared_array(name, shape, dtype=np.float64):
+    """Return a NumPy view of the named shared memory segment, creating it if needed.
+
+    Every process on the host asking for the same name gets a view of the
+    same memory. A newly created segment is zero-filled. The segment is not
+    unlinked when a process exits, so it outlives worker restarts until
+    unlink_shared_array is called (`manage.py unlink_shared_tables` does it
+    for tables the current settings no longer use).
+    """
+    if name in _segments:
+        return _segments[name][1]
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    try:
+        segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        segment = shared_memory.SharedMemory(name=name)
+        if segment.size < size:
+            segment.close()
+            raise ValueError(
+                f"Shared memory segment {name!r} holds {segment.size} bytes, {size} needed. "
+                "Unlink it with `manage.py unlink_shared_tables` or use a different RL_SHARED_TABLE_NAME."
+            )
+    if os.name == 'posix':
+        # The resource tracker would unlink the segment when this process
+        # exits, pulling it out from under the other workers
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+    _segments[name] = (segment, array)
+    return array
+
+
+def unlink_shared_array(name):
+    """Remove the named segment from the host. Existing views stay valid."""
+    if name in _segments:
+        entry = _segments.pop(name)
+        _retired.append(entry)  # Views handed out must keep their buffer
+        segment = entry[0]
+    else:
+        try:
+            segment = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            return
+    if os.name == 'posix':
+        # unlink() unregisters the segment, which shared_array already did
+        from multiprocessing import resource_tracker
+        resource_tracker.register(segment._name, 'shared_memory')
+    segment.unlink()
+
+
+def list_shared_arrays(prefix):
+    """Names of the segments on this host starting with prefix, where they can be listed."""
+    if not os.path.isdir(SHM_DIR):
+        return []
+    return sorted(name for name in os.listdir(SHM_DIR) if name.startswith(prefix))
@@ -0,0 +1,77 @@
+import asyncio
+
+from django.conf import settings
+
+from . import agents, event_log, workers
+
+
+def snapshot():
+    """Counters of this process's background stages, by stage."""
+    report = {'workers': workers.get_stage().stats()}
+    if 'learner' in agents.build_report:  # Never build the agent just to report on it
+        learner = agents.get_learner()
+        report['learner'] = {
+            'batches': learner.batches,
+            'queued': len(learner.buffer),
+            'overwritten': learner.buffer.overwritten,
+        }
+    writer = event_log.get_writer()
+    report['events'] = {'buffered': len(writer.buffer), 'written': writer.written, 'dropped': writer.dropped}
+    return report
+
+
+def format_snapshot(report):
+    parts = []
+    for stage, counters in report.items():
+        values = ', '.join(f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}"
+                           for name, value in counters.items())
+        parts.append(f"{stage}: {values}")
+    return "; ".join(parts)
+
+
+class StatsReporter:
+    """Prints the process's stage counters every interval seconds while they change.
+
+    agents.startup_report() is printed too whenever more RL components have
+    been built since the last report.
+    """
+
+    def __init__(self, interval=60):
+        self.interval = interval
+        self.last = None
+        self.builds_reported = 0
+        self.task = None
+
+    def start(self):
+        # Must be called from the event loop; starting twice is a no-op
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.report()
+
+    def report(self):
+        if len(agents.build_report) > self.builds_reported:
+            print(f"RL startup: {agents.startup_report()}")
+            self.builds_reported = len(agents.build_report)
+        report = snapshot()
+        if report != self.last:  # An idle process stays quiet
+            print(f"Stats: {format_snapshot(report)}")
+            self.last = report
+
+
+_reporter = None
+
+
+def get_reporter():
+    global _reporter
+    if _reporter is None:
+        _reporter = StatsReporter(interval=getattr(settings, 'RL_STATS_INTERVAL', 60))
+    return _reporter
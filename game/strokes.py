@@ -0,0 +1,100 @@
+import numpy as np
+
+CANVAS_WIDTH = 800
+CANVAS_HEIGHT = 600
+RASTER_SIZE = 28  # Same resolution get_state resizes full-canvas images to
+MAX_STROKE_POINTS = 2000  # Longer strokes are truncated
+
+
+class StrokeLog:
+    """Stroke deltas drawn in a room during the current turn.
+
+    Each delta only carries the points drawn since the previous send, so the
+    log also keeps a small raster of the canvas that is painted incrementally
+    and can be fed to get_state without re-rendering the whole turn.
+    """
+
+    def __init__(self, turn=None):
+        self.turn = turn
+        self.strokes = []
+        self.last_seq = -1
+        self.raster = np.zeros((RASTER_SIZE, RASTER_SIZE), dtype=np.uint8)
+
+    def add(self, seq, points):
+        seq = int(seq)
+        if seq <= self.last_seq:
+            return None  # Duplicate or out of order delta
+        points = [[int(x), int(y)] for x, y in points[:MAX_STROKE_POINTS]]
+        stroke = {'seq': seq, 'points': points}
+        self.strokes.append(stroke)
+        self.last_seq = seq
+        self.paint(points)
+        return stroke
+
+    def paint(self, points):
+        if not points:
+            return
+        xy = np.asarray(points)
+        cols = np.clip(xy[:, 0] * RASTER_SIZE // CANVAS_WIDTH, 0, RASTER_SIZE - 1)
+        rows = np.clip(xy[:, 1] * RASTER_SIZE // CANVAS_HEIGHT, 0, RASTER_SIZE - 1)
+        self.raster[rows, cols] = 255
+
+
+# Stroke logs of the rooms served by this process, keyed by room name. Each
+# process keeps its own, fed from the room's broadcasts, so a drawer or late
+# joiner on any process sees the whole turn.
+_logs = {}
+_connections = {}  # Room name -> connections to it in this process
+
+
+def get_log(room_name):
+    log = _logs.get(room_name)
+    if log is None:
+        log = _logs[room_name] = StrokeLog()
+    return log
+
+
+def add_stroke(room_name, seq, points):
+    return get_log(room_name).add(seq, points)
+
+
+def is_new(room_name, seq):
+    """Whether a delta with this seq would be added to the room's log."""
+    return int(seq) > get_log(room_name).last_seq
+
+
+def get_strokes(room_name):
+    log = _logs.get(room_name)
+    return log.strokes if log is not None else []
+
+
+def get_raster(room_name):
+    return get_log(room_name).raster.flatten()
+
+
+def start_turn(room_name, turn):
+    """Start an empty log for the given turn; a no-op if it is already the current one.
+
+    Every connection in the room reports the same turn, and only the first
+    report may clear the log, or strokes drawn since would be lost.
+    """
+    if get_log(room_name).turn != turn:
+        _logs[room_name] = StrokeLog(turn)
+
+
+def clear_strokes(room_name):
+    _logs.pop(room_name, None)
+
+
+def connected(room_name):
+    _connections[room_name] = _connections.get(room_name, 0) + 1
+
+
+def disconnected(room_name):
+    """Forget the room's log once its last connection in this process is gone."""
+    remaining = _connections.get(room_name, 0) - 1
+    if remaining > 0:
+        _connections[room_name] = remaining
+        return
+    _connections.pop(room_name, None)
+    clear_strokes(room_name)
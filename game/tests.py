@@ -1,3 +1,521 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import random
+import tempfile
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import gymnasium
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import room_state, stats, strokes
+from .checkpoints import load_checkpoint, save_checkpoint
+from .consumers import GameConsumer
+from .discretizer import StateDiscretizer
+from .env_pool import EnvPool, EnvPoolExhausted
+from .event_log import EventWriter
+from .experiments import successive_halving
+from .game_loop import RoomScheduler
+from .models import GameEvent, Room
+from .q_learning_agent import QLearningAgent
+from .q_tables import DenseQTable, words_fingerprint
+from .replay import BatchLearner, ReplayBuffer
+from .room_state import RoomStateCache
+from .shared_arrays import list_shared_arrays, unlink_shared_array
+from .vector_cartpole import VectorCartPole
+from .vocabulary import Vocabulary, build_vocabulary, build_vocabulary_from_json
+from .word_samplers import FenwickSampler, IndexedMaxHeap
+
+
+class IndexedMaxHeapTests(SimpleTestCase):
+    def test_top_after_updates(self):
+        heap = IndexedMaxHeap({'a': 1, 'b': 5, 'c': 3})
+        self.assertEqual(heap.top(), 'b')
+        heap.update('b', 0)
+        self.assertEqual(heap.top(), 'c')
+        heap.update('d', 10)
+        self.assertEqual(heap.top(), 'd')
+
+    def test_top_k_matches_sorting(self):
+        rng = random.Random(0)
+        values = {f'w{i}': rng.random() for i in range(50)}
+        heap = IndexedMaxHeap(values)
+        for _ in range(200):
+            word = rng.choice(list(values))
+            values[word] = rng.random()
+            heap.update(word, values[word])
+        expected = sorted(values, key=values.get, reverse=True)[:5]
+        self.assertEqual(heap.top_k(5), expected)
+        self.assertEqual(len(heap.top_k(100)), 50)
+
+
+class ChooseWordTests(SimpleTestCase):
+    def test_does_not_lock_onto_one_word(self):
+        random.seed(0)
+        np.random.seed(0)
+        env = SimpleNamespace(
+            action_space=SimpleNamespace(n=2),
+            observation_space=SimpleNamespace(low=-np.ones(4), high=np.ones(4)),
+        )
+        words = ['cat', 'dog', 'elephant', 'apple', 'banana', 'car', 'house', 'tree']
+        agent = QLearningAgent(env, words=words)
+        chosen = Counter()
+        for _ in range(500):
+            word = agent.choose_word()
+            chosen[word] += 1
+            agent.adjust_word_difficulty(word, 1)
+        self.assertEqual(set(chosen), set(words))
+
+
+class WordsFingerprintTests(SimpleTestCase):
+    def test_changes_with_words_and_order(self):
+        words = ['cat', 'dog', 'tree']
+        self.assertEqual(words_fingerprint(words), words_fingerprint(list(words)))
+        self.assertNotEqual(words_fingerprint(words), words_fingerprint(words + ['car']))
+        self.assertNotEqual(words_fingerprint(words), words_fingerprint(['dog', 'cat', 'tree']))
+
+    def test_vocabulary_fingerprint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            fingerprints = []
+            for i, names in enumerate([['cat', 'dog'], ['cat', 'dog'], ['dog', 'cat']]):
+                path = os.path.join(directory, f'{i}.vocab')
+                build_vocabulary([{'word': name} for name in names], path)
+                fingerprints.append(words_fingerprint(Vocabulary.load(path)))
+            self.assertEqual(fingerprints[0], fingerprints[1])
+            self.assertNotEqual(fingerprints[0], fingerprints[2])
+
+
+class StrokeLogTests(SimpleTestCase):
+    def tearDown(self):
+        strokes.clear_strokes('room')
+
+    def test_start_turn_resets_once(self):
+        strokes.add_stroke('room', 5, [[1, 2]])
+        strokes.start_turn('room', 'turn-1')
+        self.assertEqual(strokes.get_strokes('room'), [])
+        self.assertIsNotNone(strokes.add_stroke('room', 0, [[3, 4]]))  # seq restarts each turn
+        strokes.start_turn('room', 'turn-1')  # Another connection reporting the same turn
+        self.assertEqual([stroke['seq'] for stroke in strokes.get_strokes('room')], [0])
+        self.assertIsNone(strokes.add_stroke('room', 0, [[3, 4]]))
+
+    async def test_draw_stroke_frames_carry_the_points_once(self):
+        frame = json.dumps({'action': 'draw_stroke', 'seq': 0, 'points': [[10, 20], [30, 40]], 'drawer': 'u1'})
+        event = {'type': 'draw_stroke', 'text': frame, 'seq': 0}
+        self.assertNotIn('points', event)
+        consumers = [GameConsumer(), GameConsumer()]  # Two connections in this process
+        for consumer in consumers:
+            consumer.room_name = 'room'
+            consumer.send = mock.AsyncMock()
+            await consumer.draw_stroke(dict(event))
+            consumer.send.assert_awaited_once_with(text_data=frame)
+        self.assertEqual(strokes.get_strokes('room'), [{'seq': 0, 'points': [[10, 20], [30, 40]]}])
+
+    def test_log_dropped_with_last_connection(self):
+        strokes.connected('room')
+        strokes.connected('room')
+        strokes.add_stroke('room', 0, [[1, 2]])
+        strokes.disconnected('room')
+        self.assertEqual(len(strokes.get_strokes('room')), 1)
+        strokes.disconnected('room')
+        self.assertNotIn('room', strokes._logs)
+
+
+class RoomStateCacheTests(SimpleTestCase):
+    def test_forget_drops_every_entry_of_the_room(self):
+        cache = RoomStateCache()
+        for room in ('a', 'b'):
+            cache.invalidate(room, 'word')
+            cache.invalidate(room, 'roster')
+            cache.words[room] = 'cat'
+            cache.rosters[room] = ['u1']
+        cache.forget('a')
+        self.assertEqual(cache.words, {'b': 'cat'})
+        self.assertEqual(cache.rosters, {'b': ['u1']})
+        self.assertEqual(set(cache.versions), {('word', 'b'), ('roster', 'b')})
+
+
+class EventWriterTests(SimpleTestCase):
+    def writer(self):
+        writer = EventWriter(batch_size=2, interval=3600)
+        writer.batches = []
+        writer._write = lambda batch: writer.batches.append(len(batch)) or True
+        return writer
+
+    async def test_last_disconnect_flushes(self):
+        writer = self.writer()
+        writer.connected()
+        writer.connected()
+        writer.record('room', GameEvent.GUESS, 'u1', guess='cat')
+        await writer.disconnected()
+        self.assertEqual(writer.batches, [])
+        await writer.disconnected()
+        self.assertEqual(writer.batches, [1])
+        writer.stop()
+
+    def test_close_writes_everything_in_batches(self):
+        writer = self.writer()
+        for i in range(5):
+            writer.record('room', GameEvent.GUESS, 'u1', guess=str(i))
+        writer.close()
+        self.assertEqual(writer.batches, [2, 2, 1])
+        self.assertEqual(writer.buffer, [])
+
+
+class DenseQTableTests(SimpleTestCase):
+    def test_repeated_pair_converges(self):
+        table = DenseQTable(4, 2)
+        indices = np.zeros(64, dtype=np.int64)
+        actions = np.zeros(64, dtype=np.int64)
+        rewards = np.ones(64)
+        for _ in range(200):
+            table.update_batch(indices, actions, rewards, indices, 0.1, 0.9)
+            self.assertTrue(0 <= table.values[0, 0] <= 10)
+        self.assertAlmostEqual(table.values[0, 0], 10, places=3)  # Fixed point of q = 1 + 0.9q
+
+    def test_repeated_pair_matches_sequential_updates(self):
+        batch, sequential = DenseQTable(4, 2), DenseQTable(4, 2)
+        batch.update_batch(np.array([1, 1, 1, 2]), np.array([0, 0, 0, 1]), np.array([1.0, 1.0, 1.0, 2.0]),
+                           np.array([3, 3, 3, 3]), 0.5, 0.9)
+        for index, action, reward in [(1, 0, 1.0), (1, 0, 1.0), (1, 0, 1.0), (2, 1, 2.0)]:
+            sequential.update(index, action, reward, 3, 0.5, 0.9)
+        np.testing.assert_allclose(batch.values, sequential.values)
+
+
+class ReplayBufferTests(SimpleTestCase):
+    def test_pop_returns_oldest_first(self):
+        buffer = ReplayBuffer(3, 2)
+        for i in range(5):
+            buffer.push([i, i], i, float(i), [i + 1, i + 1])
+        self.assertEqual((len(buffer), buffer.overwritten), (3, 2))
+        states, actions, rewards, next_states = buffer.pop(2)
+        np.testing.assert_array_equal(actions, [2, 3])
+        np.testing.assert_array_equal(states, [[2, 2], [3, 3]])
+        np.testing.assert_array_equal(next_states[:, 0], [3, 4])
+        self.assertEqual(len(buffer), 1)
+        np.testing.assert_array_equal(buffer.pop(10)[1], [4])
+
+
+class BatchLearnerTests(SimpleTestCase):
+    async def test_applies_queued_transitions_in_batches(self):
+        applied = []
+        agent = SimpleNamespace(update_q_table_batch=lambda *batch: applied.append(len(batch[1])))
+        learner = BatchLearner(agent, ReplayBuffer(100, 4), batch_size=4, interval=0.01)
+        for i in range(10):
+            learner.push(np.zeros(4), 0, 1.0, np.zeros(4))
+        learner.start()
+        try:
+            for _ in range(100):
+                if sum(applied) == 10:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            learner.stop()
+        self.assertEqual(applied, [4, 4, 2])
+
+
+class SharedTableTests(SimpleTestCase):
+    def test_segments_named_after_shape_and_words(self):
+        env = SimpleNamespace(
+            action_space=SimpleNamespace(n=2),
+            observation_space=SimpleNamespace(low=-np.ones(4), high=np.ones(4)),
+        )
+        prefix = f'game_tests_{os.getpid()}'
+        agent = QLearningAgent(env, q_backend='shared', shared_name=prefix, words=['cat', 'dog'])
+        for name in agent.shared_segments:
+            self.addCleanup(unlink_shared_array, name)
+        self.assertEqual(agent.shared_segments[0], f'{prefix}_q_14641x2')
+        self.assertEqual(agent.shared_segments[1], f"{prefix}_words_{words_fingerprint(['cat', 'dog'])}")
+        if os.path.isdir('/dev/shm'):
+            self.assertEqual(list_shared_arrays(prefix), sorted(agent.shared_segments))
+
+    def test_ranking_picks_up_other_workers_changes(self):
+        env = SimpleNamespace(
+            action_space=SimpleNamespace(n=2),
+            observation_space=SimpleNamespace(low=-np.ones(4), high=np.ones(4)),
+        )
+        prefix = f'game_tests_rank_{os.getpid()}'
+        words = ['cat', 'dog', 'tree', 'car']
+        agent = QLearningAgent(env, q_backend='shared', shared_name=prefix, words=words)
+        other = QLearningAgent(env, q_backend='shared', shared_name=prefix, words=words)  # Same segments
+        for name in agent.shared_segments:
+            self.addCleanup(unlink_shared_array, name)
+        agent.word_ranking()
+        other.adjust_word_difficulty('tree', 1)
+        other.adjust_word_difficulty('car', 5)
+        agent.word_heap_built = 0  # Due for a refresh
+        self.assertEqual(agent.word_ranking().top_k(2), ['car', 'tree'])
+        other.adjust_word_difficulty('dog', 2)
+        self.assertEqual(list(agent.word_q_table.changed_slots()), [1])
+
+
+class SuccessiveHalvingTests(SimpleTestCase):
+    def test_rejects_keep_outside_unit_interval(self):
+        for keep in (0, 1, 1.5, -0.5):
+            with self.assertRaises(ValueError):
+                successive_halving([{}], [0], os.devnull, keep=keep)
+
+
+class VocabularySourceTests(SimpleTestCase):
+    def test_notices_edited_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source, path = os.path.join(directory, 'words.json'), os.path.join(directory, 'words.vocab')
+            with open(source, 'w') as f:
+                json.dump([{'word': 'cat'}, {'word': 'dog'}], f)
+            build_vocabulary_from_json(source, path)
+            vocabulary = Vocabulary.load(path)
+            self.assertEqual(vocabulary.source, os.path.abspath(source))
+            self.assertFalse(vocabulary.source_changed())
+            with open(source, 'w') as f:
+                json.dump([{'word': 'cat'}, {'word': 'dog'}, {'word': 'tree'}], f)
+            self.assertTrue(vocabulary.source_changed())
+            os.remove(source)
+            self.assertFalse(vocabulary.source_changed())  # Nothing to rebuild from
+
+    def test_unrecorded_source_counts_as_changed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'words.vocab')
+            build_vocabulary([{'word': 'cat'}], path)
+            self.assertTrue(Vocabulary.load(path).source_changed())
+
+
+class StatsReporterTests(SimpleTestCase):
+    def test_reports_only_when_counters_change(self):
+        reporter = stats.StatsReporter()
+        with mock.patch('builtins.print') as printed:
+            reporter.report()
+            reporter.report()
+        lines = [call.args[0] for call in printed.call_args_list if call.args[0].startswith('Stats:')]
+        self.assertEqual(len(lines), 1)
+        self.assertIn('mean_queue_wait=', lines[0])
+
+
+class VectorCartPoleTests(SimpleTestCase):
+    def test_matches_gymnasium_cartpole(self):
+        rng = np.random.default_rng(0)
+        vec_env = VectorCartPole(4, seed=0, autoreset=False)
+        starts = vec_env.reset()
+        envs = []
+        for i, start in enumerate(starts):
+            env = gymnasium.make('CartPole-v1')
+            self.addCleanup(env.close)
+            env.reset(seed=i)
+            env.unwrapped.state = start.copy()
+            envs.append(env)
+        running = np.ones(len(envs), dtype=bool)
+        while running.any():
+            actions = rng.integers(2, size=len(envs))
+            states, rewards, terminated, truncated, _ = vec_env.step(actions)
+            for i in np.flatnonzero(running):
+                observation, reward, env_terminated, env_truncated, _ = envs[i].step(int(actions[i]))
+                np.testing.assert_allclose(states[i], observation, rtol=1e-5, atol=1e-6)
+                self.assertEqual((rewards[i], terminated[i], truncated[i]), (reward, env_terminated, env_truncated))
+                running[i] = not (env_terminated or env_truncated)
+            self.assertTrue((rewards[~running & ~(terminated | truncated)] == 0).all())  # Frozen envs pay nothing
+
+    def test_truncates_after_max_steps(self):
+        vec_env = VectorCartPole(2, seed=0, max_episode_steps=5)
+        vec_env.reset()
+        for _ in range(4):
+            _, _, _, truncated, _ = vec_env.step(np.zeros(2, dtype=np.int64))
+            self.assertFalse(truncated.any())
+        vec_env.state[:] = 0  # Keep the pole upright so only the step limit ends it
+        _, _, terminated, truncated, info = vec_env.step(np.array([0, 1]))
+        self.assertTrue(truncated.all())
+        self.assertFalse(terminated.any())
+        self.assertIn('final_observation', info)
+
+
+class RoomServiceTests(TestCase):
+    def join(self, user_id):
+        return async_to_sync(room_state.join_room)('room', user_id.upper(), user_id)
+
+    def test_counts_and_turns(self):
+        self.assertEqual([self.join(user_id) for user_id in ('u1', 'u2', 'u3')], [1, 2, 3])
+        self.assertEqual([async_to_sync(room_state.advance_turn)('room') for _ in range(4)], [1, 2, 0, 1])
+        self.assertEqual(async_to_sync(room_state.leave_room)('room', 'u2'), 2)
+        self.assertEqual(async_to_sync(room_state.leave_room)('room', 'u2'), 2)  # Already gone
+        self.assertEqual(async_to_sync(room_state.leave_room)('room', 'u1'), 1)
+        self.assertEqual(async_to_sync(room_state.leave_room)('room', 'u3'), 0)
+        self.assertIsNone(async_to_sync(room_state.advance_turn)('room'))
+        self.assertIsNone(async_to_sync(room_state.leave_room)('no-such-room', 'u1'))
+        self.assertEqual(Room.objects.get(name='room').users, 0)
+
+    def test_statements_per_change(self):
+        self.join('u1')  # Creates the room
+        # Each change is one UPDATE ... RETURNING, plus the user row for joins and leaves
+        for change, statements in [(lambda: self.join('u2'), 2),
+                                   (lambda: async_to_sync(room_state.advance_turn)('room'), 1),
+                                   (lambda: async_to_sync(room_state.leave_room)('room', 'u2'), 2)]:
+            with CaptureQueriesContext(connection) as queries:
+                change()
+            sql = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].split()[0] not in ('BEGIN', 'SAVEPOINT', 'RELEASE')]
+            self.assertEqual(len(sql), statements, sql)
+
+
+class StateDiscretizerTests(SimpleTestCase):
+    def test_matches_digitize(self):
+        rng = np.random.default_rng(0)
+        bins = [np.linspace(-1, 1, 9), np.linspace(-3, 3, 5), np.array([0.0]), np.linspace(-0.5, 0.5, 11)]
+        discretizer = StateDiscretizer(bins)
+        states = rng.uniform(-4, 4, size=(500, 4))
+        states[0] = [b[0] for b in bins]  # Exactly on the lowest edges
+        expected = np.stack([np.digitize(states[:, i], b) for i, b in enumerate(bins)], axis=1)
+        np.testing.assert_array_equal(discretizer.bin_indices(states), expected)
+        np.testing.assert_array_equal(discretizer.bin_indices(states[3]), expected[3])
+        self.assertEqual(discretizer.flat_index(states[3]), np.ravel_multi_index(tuple(expected[3]), discretizer.dims))
+
+
+class CheckpointTests(SimpleTestCase):
+    def test_round_trip(self):
+        arrays = {
+            'q_table': np.arange(12, dtype=np.float64).reshape(3, 4),
+            'counts': np.array([1, 2, 3], dtype=np.int32),
+            'flags': np.array([True, False]),
+            'empty': np.zeros((0, 4)),
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'agent.ckpt')
+            save_checkpoint(path, arrays)
+            loaded = load_checkpoint(path)
+            self.assertEqual(set(loaded), set(arrays))
+            for name, array in arrays.items():
+                self.assertEqual(loaded[name].dtype, array.dtype)
+                np.testing.assert_array_equal(loaded[name], array)
+            loaded['q_table'][0, 0] = 99  # Copy-on-write: the file is untouched
+            np.testing.assert_array_equal(load_checkpoint(path)['q_table'], arrays['q_table'])
+            del loaded
+
+    def test_missing_file(self):
+        self.assertIsNone(load_checkpoint(os.path.join(tempfile.gettempdir(), 'no-such-checkpoint.ckpt')))
+
+
+class FenwickSamplerTests(SimpleTestCase):
+    def test_total_follows_updates(self):
+        sampler = FenwickSampler('abc', [1, 2, 3])
+        sampler.update('a', 4)
+        self.assertAlmostEqual(sampler.total(), 9)
+
+    def test_sampling_frequencies_match_weights(self):
+        random.seed(0)
+        weights = [1, 2, 3, 4, 0, 10]
+        sampler = FenwickSampler('abcdef', [1] * len(weights))
+        for item, weight in zip('abcdef', weights):
+            sampler.update(item, weight)
+        draws = 50000
+        counts = Counter(sampler.sample() for _ in range(draws))
+        self.assertEqual(counts['e'], 0)
+        for item, weight in zip('abcdef', weights):
+            self.assertAlmostEqual(counts[item] / draws, weight / sum(weights), delta=0.01)
+
+
+class EnvPoolTests(SimpleTestCase):
+    def pool(self, max_size):
+        made = []
+
+        def make_env():
+            env = SimpleNamespace(resets=0)
+            env.reset = lambda: setattr(env, 'resets', env.resets + 1)
+            made.append(env)
+            return env
+
+        return EnvPool(make_env, max_size=max_size), made
+
+    def test_one_env_per_room_recycled_when_empty(self):
+        pool, made = self.pool(2)
+        a = pool.acquire('a')
+        self.assertIs(pool.acquire('a'), a)  # Second connection shares the lease
+        b = pool.acquire('b')
+        self.assertIsNot(a, b)
+        with self.assertRaises(EnvPoolExhausted):
+            pool.acquire('c')
+        pool.release('a')
+        self.assertIn('a', pool.leases)  # One connection still holds it
+        pool.release('a')
+        c = pool.acquire('c')
+        self.assertIs(c, a)  # Recycled, and reset for its new room
+        self.assertEqual(len(made), 2)
+        self.assertEqual(c.resets, 2)
+
+    def test_reset_only_touches_its_room(self):
+        pool, _ = self.pool(2)
+        a, b = pool.acquire('a'), pool.acquire('b')
+        pool.reset('a')
+        pool.reset('missing')
+        self.assertEqual((a.resets, b.resets), (2, 1))
+
+
+class RoomSchedulerTests(SimpleTestCase):
+    async def test_rotates_rooms_until_cancelled(self):
+        fired = []
+
+        async def on_deadline(room_name):
+            fired.append(room_name)
+
+        scheduler = RoomScheduler(on_deadline, turn_seconds=0.05)
+        try:
+            self.assertTrue(scheduler.start_room('a', delay=0))
+            self.assertFalse(scheduler.start_room('a'))  # Already running
+            self.assertTrue(scheduler.start_room('b', delay=0.02))
+            await asyncio.sleep(0.12)
+            self.assertTrue(scheduler.cancel_room('a'))
+            self.assertFalse(scheduler.cancel_room('a'))
+            fired_for_a = fired.count('a')
+            await asyncio.sleep(0.1)
+        finally:
+            scheduler.stop()
+        self.assertGreaterEqual(fired_for_a, 2)
+        self.assertEqual(fired.count('a'), fired_for_a)
+        self.assertGreaterEqual(fired.count('b'), 3)
+        self.assertEqual(scheduler.firing, set())  # Finished turn tasks are let go
+
+    async def test_failing_turn_keeps_room_scheduled(self):
+        calls = []
+
+        async def on_deadline(room_name):
+            calls.append(room_name)
+            raise RuntimeError("boom")
+
+        scheduler = RoomScheduler(on_deadline, turn_seconds=0.02)
+        try:
+            scheduler.start_room('a', delay=0)
+            with mock.patch('builtins.print'):
+                await asyncio.sleep(0.07)
+        finally:
+            scheduler.stop()
+        self.assertGreaterEqual(len(calls), 2)
+        self.assertIn('a', scheduler)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class RosterTests(TestCase):
+    def join(self, user_id):
+        async_to_sync(room_state.join_room)('room', user_id.upper(), user_id)
+
+    def test_roster_in_join_order(self):
+        for user_id in ('u3', 'u1', 'u2'):
+            self.join(user_id)
+        cache = RoomStateCache()
+        self.assertEqual(async_to_sync(cache.roster)('room'), ['u3', 'u1', 'u2'])
+        self.assertEqual([async_to_sync(cache.drawer)('room', turn) for turn in range(4)], ['u3', 'u1', 'u2', 'u3'])
+        self.assertIsNone(async_to_sync(cache.drawer)('empty-room', 0))
+
+    def test_joins_and_leaves_update_the_cached_roster(self):
+        self.join('u1')
+        cache = RoomStateCache()
+        async_to_sync(cache.roster)('room')  # Now cached
+        self.join('u2')
+        async_to_sync(cache.joined)('room', 'u2')
+        async_to_sync(room_state.leave_room)('room', 'u1')
+        async_to_sync(cache.left)('room', 'u1')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(async_to_sync(cache.roster)('room'), ['u2'])
+        self.assertEqual(len(queries.captured_queries), 0)  # Served from memory
+        cache.invalidate('room', 'roster')  # As another process's change would
+        self.assertEqual(async_to_sync(cache.roster)('room'), ['u2'])
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+
+class VectorCartPole:
+    """CartPole-v1 for many environments at once, stepped as NumPy arrays.
+
+    The dynamics, termination thresholds, reset distribution and 500-step
+    truncation follow gymnasium's CartPole-v1. With autoreset, an episode
+    that ends is reset within the same step: the returned observation starts
+    the next episode and the last one is in info['final_observation'].
+    Without autoreset, finished environments are frozen and give no reward
+    until reset() is called.
+    """
+
+    gravity = 9.8
+    masscart = 1.0
+    masspole = 0.1
+    total_mass = masspole + masscart
+    length = 0.5  # Half the pole's length
+    polemass_length = masspole * length
+    force_mag = 10.0
+    tau = 0.02  # Seconds between state updates
+    theta_threshold_radians = 12 * 2 * np.pi / 360
+    x_threshold = 2.4
+
+    def __init__(self, num_envs, seed=None, max_episode_steps=500, autoreset=True):
+        self.num_envs = num_envs
+        self.max_episode_steps = max_episode_steps
+        self.autoreset = autoreset
+        self.rng = np.random.default_rng(seed)
+        # Same bounds as gymnasium's (0.29) observation space, so create_bins() matches
+        high = np.array([self.x_threshold * 2, np.finfo(np.float32).max,
+                         self.theta_threshold_radians * 2, np.finfo(np.float32).max], dtype=np.float32)
+        self.observation_space = SimpleNamespace(low=-high, high=high, shape=(4,))
+        self.action_space = SimpleNamespace(n=2)
+        self.state = np.zeros((num_envs, 4))
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.done = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.state = self.rng.uniform(-0.05, 0.05, size=(self.num_envs, 4))
+        self.steps[:] = 0
+        self.done[:] = False
+        return self.state.copy()
+
+    def step(self, actions):
+        x, x_dot, theta, theta_dot = self.state.T
+        force = np.where(np.asarray(actions) == 1, self.force_mag, -self.force_mag)
+        costheta, sintheta = np.cos(theta), np.sin(theta)
+        temp = (force + self.polemass_length * theta_dot ** 2 * sintheta) / self.total_mass
+        thetaacc = (self.gravity * sintheta - costheta * temp) / (
+            self.length * (4.0 / 3.0 - self.masspole * costheta ** 2 / self.total_mass)
+        )
+        xacc = temp - self.polemass_length * thetaacc * costheta / self.total_mass
+
+        running = ~self.done
+        new_state = np.stack([
+            x + self.tau * x_dot,
+            x_dot + self.tau * xacc,
+            theta + self.tau * theta_dot,
+            theta_dot + self.tau * thetaacc,
+        ], axis=1)
+        self.state = np.where(running[:, None], new_state, self.state)
+        self.steps += running
+
+        terminated = running & (
+            (np.abs(self.state[:, 0]) > self.x_threshold) | (np.abs(self.state[:, 2]) > self.theta_threshold_radians)
+        )
+        truncated = running & ~terminated & (self.steps >= self.max_episode_steps)
+        rewards = running.astype(np.float64)
+        finished = terminated | truncated
+        info = {}
+        if self.autoreset:
+            info['final_observation'] = self.state.copy()
+            if finished.any():
+                self.state[finished] = self.rng.uniform(-0.05, 0.05, size=(int(finished.sum()), 4))
+                self.steps[finished] = 0
+        else:
+            self.done |= finished
+        return self.state.copy(), rewards, terminated, truncated, info
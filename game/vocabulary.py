@@ -0,0 +1,186 @@
+import json
+import os
+import random
+import zlib
+from collections.abc import Sequence
+
+import numpy as np
+
+from .checkpoints import load_checkpoint, save_checkpoint
+
+
+def _pack(strings):
+    """UTF-8 encode strings into one byte blob plus offsets."""
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def _group(keys, n_groups):
+    """Word ids ordered by key, and where each key's run starts in that order."""
+    order = np.argsort(keys, kind='stable').astype(np.int32)
+    offsets = np.zeros(n_groups + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(keys, minlength=n_groups))
+    return order, offsets
+
+
+def build_vocabulary(entries, path, source=None):
+    """Write a vocabulary file from dicts with word, difficulty, category and steps.
+
+    The file uses the checkpoint container, so every array can be mapped in
+    place. Words are found through an open-addressing table keyed by CRC32,
+    which, unlike hash(), is the same in every process. source is the path
+    and CRC32 of the file the entries came from, if any, so an edit to it
+    can be noticed later.
+    """
+    words = [entry['word'] for entry in entries]
+    if len(set(words)) != len(words):
+        raise ValueError("Vocabulary contains duplicate words")
+    categories = sorted({entry.get('category', '') for entry in entries})
+    category_ids = np.array([categories.index(entry.get('category', '')) for entry in entries], dtype=np.uint16)
+    difficulties = np.array([entry.get('difficulty', 0) for entry in entries], dtype=np.uint8)
+
+    word_bytes, word_offsets = _pack(words)
+    step_bytes, step_offsets = _pack('\n'.join(entry.get('steps', [])) for entry in entries)
+    category_bytes, category_offsets = _pack(categories)
+
+    slots = np.full(max(8, 1 << (2 * len(words)).bit_length()), -1, dtype=np.int32)
+    mask = len(slots) - 1
+    for i, word in enumerate(words):
+        slot = zlib.crc32(word.encode()) & mask
+        while slots[slot] != -1:
+            slot = (slot + 1) & mask
+        slots[slot] = i
+
+    difficulty_order, difficulty_offsets = _group(difficulties, int(difficulties.max(initial=0)) + 1)
+    category_order, category_bucket_offsets = _group(category_ids, len(categories))
+    arrays = {}
+    if source is not None:
+        source_path, source_crc = source
+        arrays['source_path'] = np.frombuffer(source_path.encode(), dtype=np.uint8)
+        arrays['source_crc'] = np.array([source_crc], dtype=np.uint32)
+    save_checkpoint(path, {
+        **arrays,
+        'word_bytes': word_bytes, 'word_offsets': word_offsets,
+        'step_bytes': step_bytes, 'step_offsets': step_offsets,
+        'category_bytes': category_bytes, 'category_offsets': category_offsets,
+        'word_difficulty': difficulties, 'word_category': category_ids, 'slots': slots,
+        'difficulty_order': difficulty_order, 'difficulty_offsets': difficulty_offsets,
+        'category_order': category_order, 'category_bucket_offsets': category_bucket_offsets,
+    })
+
+
+def build_vocabulary_from_json(source, path):
+    with open(source, 'rb') as f:
+        data = f.read()
+    build_vocabulary(json.loads(data), path, source=(os.path.abspath(source), zlib.crc32(data)))
+
+
+class Vocabulary(Sequence):
+    """Read-only word list backed by a memory-mapped vocabulary file.
+
+    Workers that load the same file share its pages. Looking up a word, its
+    step hints, or a random word from a difficulty or category bucket are
+    all O(1) and decode only the words they touch.
+    """
+
+    def __init__(self, arrays):
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.mask = len(self.slots) - 1
+        self.categories = [self._text(self.category_bytes, self.category_offsets, i)
+                           for i in range(len(self.category_offsets) - 1)]
+
+    @classmethod
+    def load(cls, path):
+        arrays = load_checkpoint(path, mode='r')
+        if arrays is None:
+            raise FileNotFoundError(path)
+        return cls(arrays)
+
+    @property
+    def source(self):
+        """Path of the JSON file this vocabulary was built from, if it was recorded."""
+        if not hasattr(self, 'source_path'):
+            return None
+        return bytes(self.source_path).decode()
+
+    def source_changed(self):
+        """Whether the source file was edited since this vocabulary was built.
+
+        A file that never recorded its source counts as changed; one whose
+        source is gone does not, as there is nothing to rebuild it from.
+        """
+        if self.source is None:
+            return True
+        try:
+            with open(self.source, 'rb') as f:
+                return zlib.crc32(f.read()) != int(self.source_crc[0])
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _text(blob, offsets, i):
+        return bytes(blob[offsets[i]:offsets[i + 1]]).decode()
+
+    def __len__(self):
+        return len(self.word_offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._text(self.word_bytes, self.word_offsets, i)
+
+    def lookup(self, word):
+        """Id of a word, or None if it is not in the vocabulary."""
+        data = word.encode()
+        slot = zlib.crc32(data) & self.mask
+        while (i := int(self.slots[slot])) != -1:
+            if bytes(self.word_bytes[self.word_offsets[i]:self.word_offsets[i + 1]]) == data:
+                return i
+            slot = (slot + 1) & self.mask
+        return None
+
+    def __contains__(self, word):
+        return isinstance(word, str) and self.lookup(word) is not None
+
+    def fingerprint(self):
+        """Checksum of the words and their order, as 8 hex digits."""
+        checksum = zlib.crc32(np.ascontiguousarray(self.word_offsets))
+        return f'{zlib.crc32(self.word_bytes, checksum):08x}'
+
+    def index(self, word, *args):
+        i = self.lookup(word)
+        if i is None:
+            raise ValueError(f"{word!r} is not in the vocabulary")
+        return i
+
+    def steps(self, word):
+        i = self.lookup(word)
+        if i is None:
+            return None
+        text = self._text(self.step_bytes, self.step_offsets, i)
+        return text.split('\n') if text else []
+
+    def difficulty(self, word):
+        i = self.lookup(word)
+        return None if i is None else int(self.word_difficulty[i])
+
+    def category(self, word):
+        i = self.lookup(word)
+        return None if i is None else self.categories[self.word_category[i]]
+
+    def random_word(self, difficulty=None, category=None):
+        """A uniformly random word, optionally from one difficulty or category bucket."""
+        if difficulty is not None:
+            order, offsets, bucket = self.difficulty_order, self.difficulty_offsets, difficulty
+        elif category is not None:
+            order, offsets, bucket = self.category_order, self.category_bucket_offsets, self.categories.index(category)
+        else:
+            return self[random.randrange(len(self))]
+        if not 0 <= bucket < len(offsets) - 1 or offsets[bucket] == offsets[bucket + 1]:
+            raise LookupError(f"No words in bucket {bucket}")
+        return self[int(order[random.randrange(offsets[bucket], offsets[bucket + 1])])]
@@ -0,0 +1,122 @@
+import heapq
+import random
+
+
+class FenwickSampler:
+    """Weighted sampling over a fixed list of items.
+
+    Weights are kept in a Fenwick (binary indexed) tree, so changing one
+    item's weight and drawing an item are both O(log n).
+    """
+
+    def __init__(self, items, weights):
+        self.items = list(items)
+        self.positions = {item: i for i, item in enumerate(self.items)}
+        self.weights = [float(w) for w in weights]
+        n = len(self.items)
+        self.tree = [0.0] + self.weights
+        for i in range(1, n + 1):  # Linear-time build
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+        self.top = 1 << (n.bit_length() - 1) if n else 0
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def update(self, item, weight):
+        i = self.positions[item]
+        delta = weight - self.weights[i]
+        self.weights[i] = weight
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        i, total = len(self.items), 0.0
+        while i:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def sample(self):
+        target = random.random() * self.total()
+        pos, step = 0, self.top
+        while step:
+            nxt = pos + step
+            if nxt <= len(self.items) and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return self.items[min(pos, len(self.items) - 1)]
+
+
+class IndexedMaxHeap:
+    """Max-heap of items ordered by value, with a position map per item.
+
+    Changing an item's value is O(log n), the best item is O(1) and the k
+    best items are O(k log k).
+    """
+
+    def __init__(self, values=()):
+        self.values = dict(values)
+        self.heap = list(self.values)
+        self.positions = {item: i for i, item in enumerate(self.heap)}
+        for i in reversed(range(len(self.heap) // 2)):
+            self._sift_down(i)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def update(self, item, value):
+        self.values[item] = value
+        i = self.positions.get(item)
+        if i is None:
+            i = self.positions[item] = len(self.heap)
+            self.heap.append(item)
+        self._sift_down(self._sift_up(i))
+
+    def top(self):
+        return self.heap[0]
+
+    def top_k(self, k):
+        best = []
+        frontier = [(-self.values[self.heap[0]], 0)] if self.heap else []
+        while frontier and len(best) < k:
+            _, i = heapq.heappop(frontier)
+            best.append(self.heap[i])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self.heap):
+                    heapq.heappush(frontier, (-self.values[self.heap[child]], child))
+        return best
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.positions[heap[i]] = i
+        self.positions[heap[j]] = j
+
+    def _sift_up(self, i):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self.values[self.heap[parent]] >= self.values[self.heap[i]]:
+                break
+            self._swap(i, parent)
+            i = parent
+        return i
+
+    def _sift_down(self, i):
+        n = len(self.heap)
+        while True:
+            largest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and self.values[self.heap[child]] > self.values[self.heap[largest]]:
+                    largest = child
+            if largest == i:
+                return i
+            self._swap(i, largest)
+            i = largest
@@ -0,0 +1,107 @@
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+_worker_ready = False
+
+
+def _init_worker():
+    global _worker_ready
+    if _worker_ready:
+        return
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "drawing_game.settings")
+    import django
+    django.setup()  # rl_model imports the ORM models
+    _worker_ready = True
+
+
+def _run(fn, submitted_at, args):
+    waited = time.time() - submitted_at
+    return waited, fn(*args)
+
+
+def decode_drawing(drawing):
+    """Turn a data URL or raster into an agent state. Runs inside the worker."""
+    _init_worker()
+    from .rl_model import get_state
+    return get_state(drawing)
+
+
+class WorkerStage:
+    """Runs CPU-bound jobs outside the event loop with a bounded queue.
+
+    With processes=0 jobs run in the event loop's default thread pool instead
+    of a process pool. Jobs submitted while max_queue jobs are already in
+    flight are dropped and counted rather than queued.
+    """
+
+    def __init__(self, processes=1, max_queue=32):
+        self.processes = processes
+        self.max_queue = max_queue
+        self.executor = None
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def submit(self, fn, *args, callback=None):
+        # callback is called on the event loop with fn's result
+        if self.pending >= self.max_queue:
+            self.dropped += 1
+            return None
+        if self.executor is None and self.processes > 0:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, _run, fn, time.time(), args)
+        self.pending += 1
+        future.add_done_callback(functools.partial(self._job_done, callback=callback))
+        return future
+
+    def _job_done(self, future, callback=None):
+        self.pending -= 1
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.failed += 1
+            print(f"Worker job failed: {future.exception()}")
+            return
+        waited, result = future.result()
+        self.completed += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        if callback is not None:
+            callback(result)
+
+    def stats(self):
+        return {
+            'pending': self.pending,
+            'completed': self.completed,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'mean_queue_wait': self.total_wait / self.completed if self.completed else 0.0,
+            'max_queue_wait': self.max_wait,
+        }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+_stage = None
+
+
+def get_stage():
+    global _stage
+    if _stage is None:
+        _stage = WorkerStage(
+            processes=getattr(settings, 'RL_WORKER_PROCESSES', 1),
+            max_queue=getattr(settings, 'RL_WORKER_QUEUE_DEPTH', 32),
+        )
+    return _stage